@@ -0,0 +1,148 @@
+import logging
+import time
+from collections import deque
+
+import httpx
+
+from metrics import CIRCUIT_BREAKER_REJECTED, CIRCUIT_BREAKER_STATE
+
+logger = logging.getLogger("auth-service")
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+# Значения метрики состояния
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """
+    Автомат разомкнут: запрос к backend-db не отправлялся.
+    """
+
+
+class CircuitBreaker:
+    """
+    Автоматический выключатель по последним window_size вызовам.
+
+    Размыкается, когда среди них (но не меньше чем min_calls) доля ошибок достигает
+    failure_rate или доля медленных вызовов (дольше slow_call_seconds) - slow_rate.
+    В разомкнутом состоянии вызовы сразу отклоняются, через open_seconds автомат
+    переходит в полуоткрытое состояние и пропускает до half_open_calls пробных
+    вызовов: если все успешны, он замыкается, при первой неудаче снова размыкается.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int,
+        min_calls: int,
+        failure_rate: float,
+        slow_call_seconds: float,
+        slow_rate: float,
+        open_seconds: float,
+        half_open_calls: int,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+
+        # (ошибка, медленный) по последним вызовам
+        self._calls: deque[tuple[bool, bool]] = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        self._set_state(CLOSED)
+
+    def _set_state(self, state: str):
+        self.state = state
+        CIRCUIT_BREAKER_STATE.labels(name=self.name).set(STATE_VALUES[state])
+
+    def before_call(self):
+        """
+        Проверяет, можно ли выполнить вызов; иначе выбрасывает CircuitOpenError.
+        """
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                CIRCUIT_BREAKER_REJECTED.labels(name=self.name).inc()
+                raise CircuitOpenError(self.name)
+            self._set_state(HALF_OPEN)
+            self._probes = self._probe_successes = 0
+            logger.info("Автомат %s: пробные запросы", self.name)
+
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_calls:
+                CIRCUIT_BREAKER_REJECTED.labels(name=self.name).inc()
+                raise CircuitOpenError(self.name)
+            self._probes += 1
+
+    def cancel_call(self):
+        """
+        Вызов отменён (например, истёк дедлайн сообщения): о backend-db он ничего
+        не говорит и не учитывается, а занятый пробный слот освобождается.
+        """
+        if self.state == HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def after_call(self, failed: bool, elapsed: float):
+        slow = elapsed >= self.slow_call_seconds
+
+        if self.state == HALF_OPEN:
+            if failed or slow:
+                self._open("пробный запрос неуспешен")
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_calls:
+                self._calls.clear()
+                self._set_state(CLOSED)
+                logger.info("Автомат %s замкнут", self.name)
+            return
+        if self.state == OPEN:
+            # Вызов, начатый до размыкания
+            return
+
+        self._calls.append((failed, slow))
+        total = len(self._calls)
+        if total < self.min_calls:
+            return
+        failures = sum(1 for failed, _ in self._calls if failed)
+        slow_calls = sum(1 for _, slow in self._calls if slow)
+        if failures / total >= self.failure_rate:
+            self._open(f"ошибок {failures} из {total}")
+        elif slow_calls / total >= self.slow_rate:
+            self._open(f"медленных вызовов {slow_calls} из {total}")
+
+    def _open(self, reason: str):
+        self._opened_at = time.monotonic()
+        self._set_state(OPEN)
+        logger.warning("Автомат %s разомкнут на %s с: %s", self.name, self.open_seconds, reason)
+
+
+class CircuitBreakerTransport(httpx.AsyncBaseTransport):
+    """
+    Транспорт httpx, пропускающий запросы через автомат. Ошибкой считается
+    исключение транспорта или ответ 5xx; отмена запроса (CancelledError) ошибкой не считается.
+    """
+
+    def __init__(self, breaker: CircuitBreaker, transport: httpx.AsyncBaseTransport):
+        self.breaker = breaker
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.breaker.before_call()
+        started = time.monotonic()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except Exception:
+            self.breaker.after_call(failed=True, elapsed=time.monotonic() - started)
+            raise
+        except BaseException:
+            self.breaker.cancel_call()
+            raise
+        self.breaker.after_call(failed=response.status_code >= 500, elapsed=time.monotonic() - started)
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
@@ -0,0 +1,32 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+CONSUMER_IN_FLIGHT = Gauge(
+    "auth_consumer_in_flight",
+    "Сообщения, обрабатываемые в данный момент",
+    ["queue"],
+)
+CONSUMER_MESSAGE_SECONDS = Histogram(
+    "auth_consumer_message_seconds",
+    "Время обработки сообщения (от получения до ack)",
+    ["queue"],
+)
+CIRCUIT_BREAKER_STATE = Gauge(
+    "auth_circuit_breaker_state",
+    "Состояние автомата (0 - замкнут, 1 - пробные запросы, 2 - разомкнут)",
+    ["name"],
+)
+CIRCUIT_BREAKER_REJECTED = Counter(
+    "auth_circuit_breaker_rejected_total",
+    "Вызовы, отклонённые автоматом без обращения к сервису",
+    ["name"],
+)
+LOGIN_THROTTLED = Counter(
+    "auth_login_throttled_total",
+    "Попытки входа, отклонённые ограничителем до обращения к backend-db (scope: email, source)",
+    ["scope"],
+)
+USER_LOOKUP_CACHE = Counter(
+    "auth_user_lookup_cache_total",
+    "Обращения к кэшу поиска пользователей (result: hit_exists, hit_missing, miss)",
+    ["result"],
+)
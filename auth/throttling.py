@@ -0,0 +1,109 @@
+import math
+import time
+from collections import OrderedDict
+
+
+class SlidingWindowLimiter:
+    """
+    Ограничение числа попыток по ключу (email, адрес клиента) за скользящее окно.
+
+    Используется счётчик скользящего окна: хранятся только счётчики текущего и
+    предыдущего фиксированных окон, а число попыток за последние window секунд
+    оценивается как доля предыдущего окна плюс текущее. Память на ключ постоянна,
+    а число ключей ограничено max_keys (давно не встречавшиеся вытесняются),
+    поэтому перебор случайных email не раздувает память.
+    """
+
+    def __init__(self, limit: int, window: float, max_keys: int):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        # ключ -> [начало текущего окна, попыток в предыдущем окне, попыток в текущем]
+        self._counters: OrderedDict[str, list] = OrderedDict()
+
+    def _estimate(self, key: str, now: float) -> tuple[list, float]:
+        window_start = now - now % self.window
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = [window_start, 0, 0]
+        elif counter[0] != window_start:
+            # Предыдущим становится текущее окно, если оно непосредственно предшествует
+            previous = counter[2] if counter[0] == window_start - self.window else 0
+            counter = [window_start, previous, 0]
+        weight = 1 - (now - window_start) / self.window
+        return counter, counter[1] * weight + counter[2]
+
+    def hit(self, key: str) -> float:
+        """
+        Учитывает попытку. Возвращает 0, если она разрешена, иначе - через сколько
+        секунд стоит повторить (отклонённые попытки не учитываются).
+        """
+        now = time.time()
+        counter, estimate = self._estimate(key, now)
+        if estimate + 1 > self.limit:
+            window_start = counter[0]
+            # Вклад предыдущего окна убывает линейно; если его не хватает, ждём следующего окна
+            if counter[1] and counter[2] < self.limit:
+                needed = estimate + 1 - self.limit
+                return max(1, math.ceil(needed / counter[1] * self.window))
+            return max(1, math.ceil(window_start + self.window - now))
+
+        counter[2] += 1
+        self._counters[key] = counter
+        self._counters.move_to_end(key)
+        while len(self._counters) > self.max_keys:
+            self._counters.popitem(last=False)
+        return 0
+
+
+class UserLookupCache:
+    """
+    LRU-кэш результатов поиска пользователя по email: True - существует,
+    False - не найден. Положительные результаты хранятся exists_ttl секунд,
+    отрицательные - missing_ttl. Регистрация через другой экземпляр сервиса
+    снимает отрицательную запись через set(email, True) по событию; если события
+    могли потеряться (обрыв соединения), отрицательные записи сбрасываются clear_missing.
+    """
+
+    def __init__(self, max_size: int, exists_ttl: float, missing_ttl: float):
+        self.max_size = max_size
+        self.exists_ttl = exists_ttl
+        self.missing_ttl = missing_ttl
+        # email -> (существует, истекает в)
+        self._entries: OrderedDict[str, tuple[bool, float]] = OrderedDict()
+
+    @staticmethod
+    def _key(email: str) -> str:
+        return email.strip().lower()
+
+    def get(self, email: str) -> bool | None:
+        key = self._key(email)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        exists, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return exists
+
+    def set(self, email: str, exists: bool):
+        key = self._key(email)
+        current = self._entries.get(key)
+        if not exists and current is not None and current[0] and current[1] > time.monotonic():
+            # Ответ "не найден" мог быть получен до регистрации, о которой уже пришло событие
+            return
+        ttl = self.exists_ttl if exists else self.missing_ttl
+        if ttl <= 0:
+            # Устаревший результат противоположного знака оставлять нельзя
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = (exists, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear_missing(self):
+        for key in [key for key, (exists, _) in self._entries.items() if not exists]:
+            del self._entries[key]
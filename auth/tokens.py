@@ -0,0 +1,98 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+import uuid
+
+ACCESS = "access"
+REFRESH = "refresh"
+
+
+class TokenError(Exception):
+    """
+    Токен не прошёл проверку (формат, подпись, тип или срок действия).
+    """
+
+
+def parse_signing_keys(value: str) -> dict[str, bytes]:
+    """
+    Ключи подписи из строки "kid1:secret1,kid2:secret2". Первым идёт ключ,
+    которым подписываются новые токены, остальные принимаются при проверке
+    (ротация: новый ключ добавляется первым, старый удаляется после истечения
+    выданных им refresh-токенов).
+    """
+    keys = {}
+    for item in value.split(","):
+        if item.strip():
+            kid, _, secret = item.strip().partition(":")
+            keys[kid] = secret.encode()
+    return keys
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class TokenSigner:
+    """
+    Выдаёт и проверяет токены в формате JWT (HS256): короткоживущие access-токены
+    для запросов к шлюзу и refresh-токены для их обновления. Шлюз проверяет
+    access-токены сам, тем же общим ключом.
+    """
+
+    def __init__(self, keys: dict[str, bytes], access_ttl: int, refresh_ttl: int):
+        self.keys = keys
+        self.active_kid = next(iter(keys), None)
+        self.access_ttl = access_ttl
+        self.refresh_ttl = refresh_ttl
+
+    def issue(self, email: str, token_type: str, ttl: int) -> str:
+        if self.active_kid is None:
+            raise TokenError("Не заданы ключи подписи токенов")
+        now = int(time.time())
+        header = {"alg": "HS256", "typ": "JWT", "kid": self.active_kid}
+        claims = {"sub": email, "typ": token_type, "jti": uuid.uuid4().hex, "iat": now, "exp": now + ttl}
+        signing_input = (
+            _b64encode(json.dumps(header, separators=(",", ":")).encode())
+            + "."
+            + _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        )
+        signature = hmac.new(self.keys[self.active_kid], signing_input.encode(), hashlib.sha256).digest()
+        return f"{signing_input}.{_b64encode(signature)}"
+
+    def issue_pair(self, email: str) -> dict:
+        return {
+            "access_token": self.issue(email, ACCESS, self.access_ttl),
+            "refresh_token": self.issue(email, REFRESH, self.refresh_ttl),
+            "token_type": "Bearer",
+            "expires_in": self.access_ttl,
+        }
+
+    def verify(self, token: str, token_type: str, verify_exp: bool = True) -> dict:
+        """
+        Проверяет подпись, тип и срок действия токена и возвращает его claims.
+        """
+        try:
+            header_b64, claims_b64, signature_b64 = token.split(".")
+            header = json.loads(_b64decode(header_b64))
+            key = self.keys.get(header.get("kid"))
+            if key is None or header.get("alg") != "HS256":
+                raise TokenError("Неизвестный ключ подписи")
+            expected = hmac.new(key, f"{header_b64}.{claims_b64}".encode(), hashlib.sha256).digest()
+            if not hmac.compare_digest(expected, _b64decode(signature_b64)):
+                raise TokenError("Неверная подпись")
+            claims = json.loads(_b64decode(claims_b64))
+        except TokenError:
+            raise
+        except (ValueError, TypeError, AttributeError):
+            raise TokenError("Неверный формат токена")
+        if claims.get("typ") != token_type:
+            raise TokenError("Неверный тип токена")
+        if verify_exp and claims.get("exp", 0) <= time.time():
+            raise TokenError("Срок действия токена истёк")
+        return claims
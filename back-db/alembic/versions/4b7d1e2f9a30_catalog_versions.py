@@ -0,0 +1,34 @@
+"""catalog versions
+
+Revision ID: 4b7d1e2f9a30
+Revises: 635cecd9f94c
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7d1e2f9a30'
+down_revision: Union[str, None] = '635cecd9f94c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    catalog_versions = op.create_table('catalog_versions',
+    sa.Column('entity', sa.String(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('entity')
+    )
+    op.bulk_insert(catalog_versions, [
+        {'entity': 'exams', 'version': 0},
+        {'entity': 'retakes', 'version': 0},
+    ])
+
+
+def downgrade() -> None:
+    op.drop_table('catalog_versions')
@@ -0,0 +1,33 @@
+"""password hash length
+
+Revision ID: 7c2e9a4d5b18
+Revises: 4b7d1e2f9a30
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e9a4d5b18'
+down_revision: Union[str, None] = '4b7d1e2f9a30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Хэш scrypt с параметрами и солью не помещается в 64 символа sha256
+    op.alter_column('users', 'password',
+               existing_type=sa.String(length=64),
+               type_=sa.String(length=255),
+               existing_nullable=False)
+
+
+def downgrade() -> None:
+    op.alter_column('users', 'password',
+               existing_type=sa.String(length=255),
+               type_=sa.String(length=64),
+               existing_nullable=False)
@@ -0,0 +1,38 @@
+"""seat capacity
+
+Revision ID: b5d83f1e6c42
+Revises: 9e41c6b2d7a5
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d83f1e6c42'
+down_revision: Union[str, None] = '9e41c6b2d7a5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table, enrolments, key in (('exams', 'enrolments_exams', 'exam_id'), ('retakes', 'enrolments_retake', 'retake_id')):
+        op.add_column(table, sa.Column('capacity', sa.Integer(), nullable=True))
+        op.add_column(table, sa.Column('enrolled_count', sa.Integer(), server_default='0', nullable=False))
+        op.execute(
+            f"UPDATE {table} SET enrolled_count = "
+            f"(SELECT count(*) FROM {enrolments} WHERE {enrolments}.{key} = {table}.id)"
+        )
+        op.create_check_constraint(
+            f'ck_{table}_seats', table, 'enrolled_count >= 0 AND (capacity IS NULL OR enrolled_count <= capacity)'
+        )
+
+
+def downgrade() -> None:
+    for table in ('exams', 'retakes'):
+        op.drop_constraint(f'ck_{table}_seats', table, type_='check')
+        op.drop_column(table, 'enrolled_count')
+        op.drop_column(table, 'capacity')
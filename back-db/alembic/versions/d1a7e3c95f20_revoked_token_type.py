@@ -0,0 +1,30 @@
+"""revoked token type
+
+Revision ID: d1a7e3c95f20
+Revises: b5d83f1e6c42
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1a7e3c95f20'
+down_revision: Union[str, None] = 'b5d83f1e6c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Тип уже отозванных токенов неизвестен: они считаются access-токенами, чтобы
+    # шлюз продолжал их отклонять, и уходят из списка по истечении срока
+    op.add_column('revoked_tokens', sa.Column('token_type', sa.String(length=16), server_default='access', nullable=False))
+    op.create_index('ix_revoked_tokens_type_expires_at', 'revoked_tokens', ['token_type', 'expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_revoked_tokens_type_expires_at', table_name='revoked_tokens')
+    op.drop_column('revoked_tokens', 'token_type')
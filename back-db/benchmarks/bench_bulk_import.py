@@ -0,0 +1,85 @@
+"""
+Загрузка каталога семестра в работающий backend-db: экзамены и записи на них
+по одной (POST /exams/, POST /enrolments-exams/) и через /import одним запросом.
+Пользователи для записей создаются заранее через /users/import.
+
+Запускать на отдельной базе: скрипт создаёт экзамены, пользователей и записи.
+
+    python benchmarks/bench_bulk_import.py --url http://localhost:8001 --exams 300 --students 1000 --per-student 3
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+import httpx
+
+
+def _catalog(args, prefix: str) -> tuple[list[dict], list[dict]]:
+    exams = [{"name": f"{prefix} экзамен {i}", "date": "15-01-2026"} for i in range(args.exams)]
+    users = [
+        {"name": f"Студент {i}", "email": f"{prefix}-{i}@bench.example.com", "password": "bench-password"}
+        for i in range(args.students)
+    ]
+    return exams, users
+
+
+def _enrolments(users: list[dict], exam_ids: list[int], per_student: int) -> list[dict]:
+    return [
+        {"email": user["email"], "exam_id": exam_id, "type": "exam", "date": "15-01-2026"}
+        for user in users
+        for exam_id in random.sample(exam_ids, min(per_student, len(exam_ids)))
+    ]
+
+
+async def _new_exam_ids(client: httpx.AsyncClient, names: set[str]) -> list[int]:
+    snapshot = (await client.get("/exams/snapshot")).json()
+    return [item["id"] for item in snapshot["items"] if item["name"] in names]
+
+
+async def one_by_one(client: httpx.AsyncClient, args) -> tuple[float, int]:
+    exams, users = _catalog(args, f"single-{uuid.uuid4().hex[:8]}")
+    (await client.post("/users/import", json=users)).raise_for_status()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def post(path: str, body: dict):
+        async with semaphore:
+            (await client.post(path, json=body)).raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(post("/exams/", exam) for exam in exams))
+    enrolments = _enrolments(users, await _new_exam_ids(client, {exam["name"] for exam in exams}), args.per_student)
+    await asyncio.gather(*(post("/enrolments-exams/", enrolment) for enrolment in enrolments))
+    return time.perf_counter() - started, len(exams) + len(enrolments)
+
+
+async def bulk(client: httpx.AsyncClient, args) -> tuple[float, int]:
+    exams, users = _catalog(args, f"bulk-{uuid.uuid4().hex[:8]}")
+    (await client.post("/users/import", json=users)).raise_for_status()
+
+    started = time.perf_counter()
+    (await client.post("/exams/import", json=exams)).raise_for_status()
+    enrolments = _enrolments(users, await _new_exam_ids(client, {exam["name"] for exam in exams}), args.per_student)
+    report = (await client.post("/enrolments-exams/import", json=enrolments)).raise_for_status().json()
+    assert report["created"] == len(enrolments), report
+    return time.perf_counter() - started, len(exams) + len(enrolments)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8001")
+    parser.add_argument("--exams", type=int, default=300)
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--per-student", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=20, help="параллельных запросов при загрузке по одной")
+    args = parser.parse_args()
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=300) as client:
+        for name, load in (("по одной", one_by_one), ("импорт", bulk)):
+            elapsed, rows = await load(client, args)
+            print(f"{name:>10}: {rows} записей за {elapsed:.2f} с ({rows / elapsed:.0f} записей/с)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+"""
+Пропускная способность входа (проверок пароля в секунду) в зависимости от
+стоимости scrypt и размера пула процессов. Проверка идёт через PasswordHasher,
+как в /auth/authorization; база и HTTP не участвуют.
+
+Кроме скорости выводится наибольшая задержка цикла событий за прогон: при
+хэшировании в пуле она должна оставаться на уровне миллисекунд.
+
+    python benchmarks/bench_password_hashing.py --log-n 12 13 14 15 --workers 1 2 4 --logins 200
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from passwords import PasswordHasher, hash_password_sync  # noqa: E402
+
+PASSWORD = "correct horse battery staple"
+
+
+def _percentile(values: list[float], p: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(len(values) * p))]
+
+
+async def _watch_loop_lag(stop: asyncio.Event, lags: list[float], interval: float = 0.005):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+async def run(log_n: int, workers: int, args) -> dict:
+    hasher = PasswordHasher(workers=workers, log_n=log_n)
+    hasher.start()
+    stored = hash_password_sync(PASSWORD, log_n, hasher.r, hasher.p)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+
+    async def login():
+        async with semaphore:
+            started = time.perf_counter()
+            valid, _ = await hasher.verify(PASSWORD, stored)
+            latencies.append(time.perf_counter() - started)
+            assert valid
+
+    try:
+        # Прогрев: запуск процессов пула не должен попадать в замер
+        await asyncio.gather(*(login() for _ in range(workers)))
+        latencies.clear()
+
+        stop, lags = asyncio.Event(), []
+        watcher = asyncio.create_task(_watch_loop_lag(stop, lags))
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(args.logins)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await watcher
+    finally:
+        hasher.close()
+
+    return {
+        "throughput": args.logins / elapsed,
+        "p50": statistics.median(latencies),
+        "p99": _percentile(latencies, 0.99),
+        "max_lag": max(lags, default=0.0),
+    }
+
+
+async def main(args):
+    print(f"{'log_n':>5} {'workers':>7} {'logins/s':>9} {'p50, мс':>9} {'p99, мс':>9} {'лаг цикла, мс':>14}")
+    for log_n in args.log_n:
+        for workers in args.workers:
+            result = await run(log_n, workers, args)
+            print(f"{log_n:>5} {workers:>7} {result['throughput']:>9.1f} {result['p50'] * 1000:>9.1f} "
+                  f"{result['p99'] * 1000:>9.1f} {result['max_lag'] * 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log-n", type=int, nargs="+", default=[12, 13, 14, 15])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=64)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,145 @@
+"""
+Конкурентная запись на один экзамен с ограниченным числом мест в работающем
+backend-db: concurrency одновременных POST /enrolments-exams/ от разных
+студентов на экзамен с capacity местами. Проверяется, что записей создано
+ровно min(capacity, студентов), enrolled_count совпадает с ним (мест не занято
+больше capacity), остальные получили 409; выводятся пропускная способность и задержки.
+
+С --batches N дополнительно проверяются пакеты: N одновременных POST
+/enrolments-exams/batch, каждый записывает своего студента на --batch-exams
+общих экзаменов в случайном порядке. Пакеты с общими экзаменами не должны
+взаимно блокироваться (ни одного ответа 500), а мест на каждом экзамене должно
+быть занято ровно min(capacity, N).
+
+Запускать на отдельной базе: скрипт создаёт экзамены, пользователей и записи.
+
+    python benchmarks/bench_seat_contention.py --url http://localhost:8001 --students 500 --capacity 100 --concurrency 200
+    python benchmarks/bench_seat_contention.py --batches 200 --batch-exams 10 --capacity 100
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from collections import Counter
+
+import httpx
+
+
+def _percentile(values: list[float], p: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(len(values) * p))]
+
+
+async def _create_students(client: httpx.AsyncClient, prefix: str, count: int) -> list[str]:
+    emails = [f"{prefix}-{i}@bench.example.com" for i in range(count)]
+    (await client.post("/users/import", json=[
+        {"name": f"Студент {i}", "email": email, "password": "bench-password"} for i, email in enumerate(emails)
+    ])).raise_for_status()
+    return emails
+
+
+async def run(client: httpx.AsyncClient, args) -> bool:
+    prefix = uuid.uuid4().hex[:8]
+    exam = (await client.post("/exams/", json={
+        "name": f"contention-{prefix}", "date": "15-01-2026", "capacity": args.capacity,
+    })).raise_for_status().json()
+    emails = await _create_students(client, prefix, args.students)
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    start_gate = asyncio.Event()
+    statuses: Counter = Counter()
+    latencies = []
+
+    async def enroll(email: str):
+        await start_gate.wait()
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post("/enrolments-exams/", json={
+                "email": email, "exam_id": exam["id"], "type": "exam", "date": "15-01-2026",
+            })
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] += 1
+
+    tasks = [asyncio.create_task(enroll(email)) for email in emails]
+    started = time.perf_counter()
+    start_gate.set()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    enrolled = (await client.get(f"/exams/{exam['id']}/seats")).raise_for_status().json()["enrolled_count"]
+    expected = min(args.capacity, args.students)
+
+    print(f"студентов {args.students}, мест {args.capacity}, одновременно {args.concurrency}")
+    print(f"ответы: {dict(sorted(statuses.items()))}")
+    print(f"{len(latencies) / elapsed:.0f} запросов/с, p50 {_percentile(latencies, 0.5) * 1000:.1f} мс, "
+          f"p99 {_percentile(latencies, 0.99) * 1000:.1f} мс")
+    print(f"записано {statuses[200]}, enrolled_count {enrolled}, ожидалось {expected}")
+    return statuses[200] == enrolled == expected and statuses[409] == args.students - expected
+
+
+async def run_batches(client: httpx.AsyncClient, args) -> bool:
+    prefix = uuid.uuid4().hex[:8]
+    exam_ids = []
+    for i in range(args.batch_exams):
+        exam = (await client.post("/exams/", json={
+            "name": f"contention-batch-{prefix}-{i}", "date": "15-01-2026", "capacity": args.capacity,
+        })).raise_for_status().json()
+        exam_ids.append(exam["id"])
+    emails = await _create_students(client, prefix, args.batches)
+
+    start_gate = asyncio.Event()
+    statuses: Counter = Counter()
+    enrolled_by_exam: Counter = Counter()
+
+    async def submit(email: str):
+        order = random.sample(exam_ids, len(exam_ids))
+        await start_gate.wait()
+        response = await client.post("/enrolments-exams/batch", json=[
+            {"email": email, "exam_id": exam_id, "type": "exam", "date": "15-01-2026"} for exam_id in order
+        ])
+        statuses[response.status_code] += 1
+        if response.status_code == 200:
+            for exam_id, result in zip(order, response.json()):
+                if result["status"] == "success":
+                    enrolled_by_exam[exam_id] += 1
+
+    tasks = [asyncio.create_task(submit(email)) for email in emails]
+    started = time.perf_counter()
+    start_gate.set()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    expected = min(args.capacity, args.batches)
+    ok = statuses[200] == args.batches
+    for exam_id in exam_ids:
+        seats = (await client.get(f"/exams/{exam_id}/seats")).raise_for_status().json()["enrolled_count"]
+        ok = ok and seats == enrolled_by_exam[exam_id] == expected
+
+    print(f"пакетов {args.batches} по {args.batch_exams} общих экзаменов, мест {args.capacity}")
+    print(f"ответы: {dict(sorted(statuses.items()))}, {args.batches / elapsed:.0f} пакетов/с")
+    print(f"записано по экзаменам: {sorted(set(enrolled_by_exam.values()))}, ожидалось {expected}")
+    return ok
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8001")
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--capacity", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--batches", type=int, default=0, help="одновременных пакетов (0 - не проверять пакеты)")
+    parser.add_argument("--batch-exams", type=int, default=10, help="общих экзаменов в каждом пакете")
+    args = parser.parse_args()
+
+    connections = max(args.concurrency, args.batches)
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    async with httpx.AsyncClient(base_url=args.url, timeout=60, limits=limits) as client:
+        ok = await run(client, args)
+        if args.batches:
+            ok = await run_batches(client, args) and ok
+    print("OK: мест занято не больше capacity" if ok else "ОШИБКА: число записей не совпадает с ожидаемым")
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
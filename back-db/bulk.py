@@ -0,0 +1,89 @@
+import csv
+import io
+import json
+
+from fastapi import HTTPException, Query, Request, Response
+from pydantic import BaseModel, ValidationError
+
+from config import settings
+
+# Форматы тела запроса импорта: JSON-массив объектов, NDJSON (объект на строку)
+# или CSV с заголовком. Формат выбирается по Content-Type.
+JSON_TYPES = {"application/json"}
+NDJSON_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+CSV_TYPES = {"text/csv", "application/csv"}
+
+
+class ImportParams:
+    """
+    atomic=true (по умолчанию): при ошибке хотя бы в одной строке ничего не
+    записывается; atomic=false - записываются строки без ошибок.
+    """
+
+    def __init__(self, atomic: bool = Query(True)):
+        self.atomic = atomic
+
+
+def _parse_rows(body: bytes, content_type: str) -> list:
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Тело запроса должно быть в кодировке UTF-8")
+
+    if content_type in CSV_TYPES:
+        return list(csv.DictReader(io.StringIO(text)))
+    if content_type in NDJSON_TYPES:
+        rows = []
+        for line_number, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"Строка {line_number}: некорректный JSON")
+        return rows
+    if content_type in JSON_TYPES:
+        try:
+            rows = json.loads(text)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Некорректный JSON")
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=400, detail="Ожидается JSON-массив")
+        return rows
+    raise HTTPException(status_code=415, detail="Поддерживаются application/json, application/x-ndjson и text/csv")
+
+
+async def read_rows(request: Request, schema: type[BaseModel]) -> tuple[list[tuple[int, BaseModel]], list[dict]]:
+    """
+    Читает и проверяет строки импорта. Возвращает (строки без ошибок вместе с
+    номерами, ошибки). Строки нумеруются с 1 в порядке тела запроса (для CSV -
+    без заголовка).
+    """
+    content_type = request.headers.get("content-type", "application/json").split(";")[0].strip().lower()
+    rows = _parse_rows(await request.body(), content_type)
+    if len(rows) > settings.BULK_IMPORT_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"Не больше {settings.BULK_IMPORT_MAX_ROWS} строк за один импорт")
+
+    valid: list[tuple[int, BaseModel]] = []
+    errors: list[dict] = []
+    for row_number, row in enumerate(rows, start=1):
+        try:
+            valid.append((row_number, schema.model_validate(row)))
+        except ValidationError as e:
+            error = e.errors()[0]
+            errors.append(import_error(row_number, f"{'.'.join(map(str, error['loc']))}: {error['msg']}"))
+    return valid, errors
+
+
+def import_error(row: int, detail: str) -> dict:
+    return {"row": row, "detail": detail}
+
+
+def import_report(response: Response, params: ImportParams, total: int, created: int, errors: list[dict]) -> dict:
+    """
+    Отчёт об импорте. Если импорт атомарный и в нём есть ошибки, ничего не
+    записано, и ответ отдаётся со статусом 422.
+    """
+    if errors and params.atomic:
+        response.status_code = 422
+    return {"total": total, "created": created, "failed": len(errors), "errors": sorted(errors, key=lambda error: error["row"])}
@@ -1,7 +1,13 @@
+import time
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, insert, or_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.future import select
-from models import User, Exam, Retake, Enrolments_Exams, Enrolments_Retake
-from schemas import UserCreate, ExamCreate, RetakeCreate, EnrolmentExamCreate, EnrolmentRetakeCreate, UserUpdate
+from models import User, Exam, Retake, Enrolments_Exams, Enrolments_Retake, CatalogVersion, RevokedToken
+from bulk import import_error
+from pagination import fetch_page
+from schemas import UserCreate, ExamCreate, RetakeCreate, EnrolmentExamCreate, EnrolmentRetakeCreate, UserUpdate, RevokedTokenCreate
 
 
 async def create_user(db: AsyncSession, user: UserCreate):
@@ -22,9 +28,9 @@ async def get_user_by_id(db: AsyncSession, user_id: int):
     return result.scalars().first()
 
 
-async def get_users(db: AsyncSession):
-    result = await db.execute(select(User))
-    return result.scalars().all()
+async def get_users(db: AsyncSession, limit: int, after: str | None = None):
+    """Страница списка по id: (записи, курсор следующей страницы)."""
+    return await fetch_page(db, select(User), [User.id], limit, after)
 
 
 async def update_user(db: AsyncSession, user_id: int, user: UserUpdate):
@@ -44,6 +50,41 @@ async def update_user(db: AsyncSession, user_id: int, user: UserUpdate):
     return db_user
 
 
+async def set_user_password(db: AsyncSession, db_user: User, password: str):
+    db_user.password = password
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
+
+
+async def revoke_token(db: AsyncSession, token: RevokedTokenCreate) -> bool:
+    """
+    Отзывает токен. Возвращает False, если он уже был отозван: для refresh-токена
+    это значит, что его пытаются использовать повторно.
+    """
+    # Истёкшие токены не пройдут проверку и без списка отзыва
+    await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= int(time.time())))
+    db.add(RevokedToken(jti=token.jti, email=token.email, token_type=token.token_type, expires_at=token.expires_at))
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        return False
+    return True
+
+
+async def get_revoked_tokens(db: AsyncSession, token_type: str):
+    """
+    Неистёкшие отозванные токены типа token_type. Отозванных access-токенов не
+    больше, чем выдано за ACCESS_TOKEN_TTL, refresh-токены живут намного дольше.
+    """
+    result = await db.execute(select(RevokedToken).filter(
+        RevokedToken.token_type == token_type,
+        RevokedToken.expires_at > int(time.time()),
+    ))
+    return result.scalars().all()
+
+
 async def delete_user(db: AsyncSession, user_id: int):
     db_user = await get_user_by_id(db, user_id)
     if not db_user:
@@ -54,12 +95,75 @@ async def delete_user(db: AsyncSession, user_id: int):
     return db_user
 
 
+async def import_users(db: AsyncSession, users: list[tuple[int, UserCreate]], atomic: bool) -> tuple[int, list[dict]]:
+    """
+    Импорт пользователей (пароли уже захэшированы) одной транзакцией: многострочные
+    INSERT ... ON CONFLICT DO NOTHING RETURNING. Возвращает (создано, ошибки по строкам).
+    При atomic и хотя бы одной ошибке транзакция откатывается.
+    """
+    errors = []
+    rows = {}
+    for row, user in users:
+        if user.email in rows:
+            errors.append(import_error(row, "Пользователь с таким email уже есть в импорте"))
+        else:
+            rows[user.email] = (row, {"name": user.name, "email": user.email, "password": user.password})
+    if not rows:
+        return 0, errors
+
+    statement = pg_insert(User).on_conflict_do_nothing(index_elements=[User.email]).returning(User.email)
+    created = set((await db.execute(statement, [values for _, values in rows.values()])).scalars())
+    errors += [
+        import_error(row, "Пользователь с таким email уже существует")
+        for email, (row, _) in rows.items() if email not in created
+    ]
+    return await _finish_import(db, len(created), errors, atomic)
+
+
+async def _finish_import(db: AsyncSession, created: int, errors: list[dict], atomic: bool) -> tuple[int, list[dict]]:
+    if atomic and errors:
+        await db.rollback()
+        return 0, errors
+    await db.commit()
+    return created, errors
+
+
+async def bump_catalog_version(db: AsyncSession, entity: str) -> int:
+    """
+    Увеличивает версию каталога в текущей транзакции и возвращает новое значение.
+    Строка версии остаётся заблокированной до коммита, поэтому изменения каталога
+    получают версии в порядке коммитов.
+    """
+    result = await db.execute(
+        update(CatalogVersion)
+        .where(CatalogVersion.entity == entity)
+        .values(version=CatalogVersion.version + 1)
+        .returning(CatalogVersion.version)
+    )
+    return result.scalar_one()
+
+
+async def get_catalog_snapshot(db: AsyncSession, model, entity: str):
+    """
+    Возвращает (версия, записи) каталога, согласованные между собой: блокировка
+    строки версии FOR SHARE ждёт незавершённые изменения и не даёт начаться новым.
+    """
+    result = await db.execute(
+        select(CatalogVersion.version).where(CatalogVersion.entity == entity).with_for_update(read=True)
+    )
+    version = result.scalar_one()
+    items = await db.execute(select(model).order_by(model.id))
+    return version, items.scalars().all()
+
+
 async def create_exam(db: AsyncSession, exam: ExamCreate):
-    db_exam = Exam(name=exam.name, date=exam.date)
+    """Создаёт экзамен. Возвращает (экзамен, новая версия каталога экзаменов)."""
+    db_exam = Exam(name=exam.name, date=exam.date, capacity=exam.capacity)
     db.add(db_exam)
+    version = await bump_catalog_version(db, "exams")
     await db.commit()
     await db.refresh(db_exam)
-    return db_exam
+    return db_exam, version
 
 
 async def get_exam_by_id(db: AsyncSession, exam_id: int):
@@ -67,17 +171,19 @@ async def get_exam_by_id(db: AsyncSession, exam_id: int):
     return result.scalars().first()
 
 
-async def get_exams(db: AsyncSession):
-    result = await db.execute(select(Exam))
-    return result.scalars().all()
+async def get_exams(db: AsyncSession, limit: int, after: str | None = None):
+    """Страница списка по id: (записи, курсор следующей страницы)."""
+    return await fetch_page(db, select(Exam), [Exam.id], limit, after)
 
 
 async def create_retake(db: AsyncSession, retake: RetakeCreate):
-    db_retake = Retake(name=retake.name, date=retake.date)
+    """Создаёт пересдачу. Возвращает (пересдача, новая версия каталога пересдач)."""
+    db_retake = Retake(name=retake.name, date=retake.date, capacity=retake.capacity)
     db.add(db_retake)
+    version = await bump_catalog_version(db, "retakes")
     await db.commit()
     await db.refresh(db_retake)
-    return db_retake
+    return db_retake, version
 
 
 async def get_retake_by_id(db: AsyncSession, retake_id: int):
@@ -85,24 +191,271 @@ async def get_retake_by_id(db: AsyncSession, retake_id: int):
     return result.scalars().first()
 
 
-async def get_retakes(db: AsyncSession):
-    result = await db.execute(select(Retake))
-    return result.scalars().all()
+async def get_retakes(db: AsyncSession, limit: int, after: str | None = None):
+    """Страница списка по id: (записи, курсор следующей страницы)."""
+    return await fetch_page(db, select(Retake), [Retake.id], limit, after)
 
 
-async def create_enrolment_exam(db: AsyncSession, enrolment: EnrolmentExamCreate):
-    db_enrolment = Enrolments_Exams(
-        email=enrolment.email,
-        exam_id=enrolment.exam_id,
-        type=enrolment.type,
-        date=enrolment.date
+async def import_catalog(db: AsyncSession, model, entity: str, items: list[ExamCreate | RetakeCreate]):
+    """
+    Импорт экзаменов или пересдач одной транзакцией (многострочный INSERT ...
+    RETURNING) с одним увеличением версии каталога entity.
+    Возвращает (созданные записи в порядке items, новая версия каталога).
+    """
+    created = list(await db.scalars(
+        insert(model).returning(model, sort_by_parameter_order=True),
+        [{"name": item.name, "date": item.date, "capacity": item.capacity} for item in items],
+    ))
+    version = await bump_catalog_version(db, entity)
+    await db.commit()
+    return created, version
+
+
+class ReferenceNotFound(Exception):
+    """
+    Вставка нарушила внешний ключ: нет связанной записи. column - столбец
+    ключа (email, exam_id, retake_id) или None, если его не удалось определить.
+    """
+
+    def __init__(self, column: str | None):
+        super().__init__(column)
+        self.column = column
+
+
+def _foreign_key_violation(error: IntegrityError, columns: list[str]) -> ReferenceNotFound | None:
+    # 23503 - foreign_key_violation; столбец виден по имени ограничения <таблица>_<столбец>_fkey
+    if getattr(error.orig, "sqlstate", None) != "23503" and "foreign key" not in str(error.orig).lower():
+        return None
+    message = str(error.orig)
+    return ReferenceNotFound(next((column for column in columns if f"_{column}_fkey" in message), None))
+
+
+class NoSeatsLeft(Exception):
+    """На экзамене или пересдаче не осталось свободных мест."""
+
+
+async def _take_seats(db: AsyncSession, parent, item_id: int, seats: int = 1) -> bool:
+    """
+    Занимает seats мест на экзамене или пересдаче (parent - Exam или Retake)
+    условным UPDATE ... SET enrolled_count = enrolled_count + seats
+    WHERE enrolled_count + seats <= capacity RETURNING. Без SELECT ... FOR UPDATE:
+    параллельные записи на тот же экзамен ждут блокировку строки только до коммита
+    и перепроверяют условие по новому значению, поэтому мест не занимается больше capacity.
+    Возвращает False, если мест не хватает (или экзамена нет).
+    """
+    result = await db.execute(
+        update(parent)
+        .where(
+            parent.id == item_id,
+            or_(parent.capacity.is_(None), parent.enrolled_count + seats <= parent.capacity),
+        )
+        .values(enrolled_count=parent.enrolled_count + seats)
+        .returning(parent.id)
+    )
+    return result.first() is not None
+
+
+async def _take_available_seats(db: AsyncSession, parent, item_id: int, wanted: int) -> int:
+    """
+    Занимает столько из wanted мест, сколько свободно, и возвращает их число.
+    Свободные места читаются без блокировки и занимаются условным UPDATE
+    (_take_seats); если их успели занять параллельные записи, попытка
+    повторяется с новым числом свободных мест.
+    """
+    while True:
+        row = (await db.execute(
+            select(parent.capacity, parent.enrolled_count).where(parent.id == item_id)
+        )).first()
+        if row is None:
+            return 0
+        capacity, enrolled = row
+        seats = wanted if capacity is None else min(wanted, capacity - enrolled)
+        if seats <= 0:
+            return 0
+        if await _take_seats(db, parent, item_id, seats):
+            return seats
+
+
+async def get_seats(db: AsyncSession, parent, item_id: int) -> dict | None:
+    """Занятые и свободные места экзамена или пересдачи (parent - Exam или Retake); None, если его нет."""
+    row = (await db.execute(
+        select(parent.capacity, parent.enrolled_count).where(parent.id == item_id)
+    )).first()
+    if row is None:
+        return None
+    capacity, enrolled = row
+    return {
+        "id": item_id,
+        "capacity": capacity,
+        "enrolled_count": enrolled,
+        "available": None if capacity is None else max(capacity - enrolled, 0),
+    }
+
+
+async def _release_seats(db: AsyncSession, parent, item_id: int, seats: int = 1):
+    await db.execute(
+        update(parent).where(parent.id == item_id).values(enrolled_count=parent.enrolled_count - seats)
     )
-    db.add(db_enrolment)
+
+
+async def _insert_enrolment(db: AsyncSession, model, key: str, parent, enrolment):
+    """
+    Создаёт запись без предварительных проверок: INSERT ... ON CONFLICT DO NOTHING
+    RETURNING, затем занимает место (_take_seats) и фиксирует транзакцию.
+    Вставка идёт первой, чтобы повторная запись отклонялась, не трогая строку
+    экзамена, а блокировка этой строки держалась только до коммита.
+
+    Возвращает запись или None, если она уже существует (в том числе созданная
+    параллельным запросом). Если нет пользователя или экзамена/пересдачи,
+    выбрасывает ReferenceNotFound, если нет свободных мест - NoSeatsLeft.
+    """
+    item_id = getattr(enrolment, key)
+    statement = (
+        pg_insert(model)
+        .values(email=enrolment.email, type=enrolment.type, date=enrolment.date, **{key: item_id})
+        .on_conflict_do_nothing(index_elements=[model.email, getattr(model, key)])
+        .returning(model)
+    )
+    try:
+        db_enrolment = (await db.execute(statement)).scalars().first()
+    except IntegrityError as e:
+        await db.rollback()
+        violation = _foreign_key_violation(e, ["email", key])
+        if violation is None:
+            raise
+        raise violation from e
+    if db_enrolment is None:
+        await db.rollback()
+        return None
+    if not await _take_seats(db, parent, item_id):
+        await db.rollback()
+        raise NoSeatsLeft(item_id)
     await db.commit()
-    await db.refresh(db_enrolment)
     return db_enrolment
 
 
+async def _delete_enrolment(db: AsyncSession, model, key: str, parent, email: str, item_id: int) -> bool:
+    """
+    Удаляет запись (DELETE ... RETURNING) и освобождает её место в той же транзакции.
+    Возвращает False, если записи не было.
+    """
+    result = await db.execute(
+        delete(model).where(model.email == email, getattr(model, key) == item_id).returning(model.email)
+    )
+    deleted = result.first() is not None
+    if deleted:
+        await _release_seats(db, parent, item_id)
+    await db.commit()
+    return deleted
+
+
+async def import_enrolments(
+    db: AsyncSession,
+    model,
+    key: str,
+    parent,
+    enrolments: list[tuple[int, EnrolmentExamCreate | EnrolmentRetakeCreate]],
+    atomic: bool,
+    messages: dict[str, str],
+) -> tuple[int, list[dict]]:
+    """
+    Импорт записей на экзамены или пересдачи (key - exam_id или retake_id, parent -
+    Exam или Retake) одной транзакцией. Экзамены и пользователи проверяются двумя
+    запросами на весь импорт, записи вставляются многострочными INSERT ... ON CONFLICT
+    DO NOTHING RETURNING. messages - тексты ошибок "not_found", "exists" и "no_seats".
+    Возвращает (создано, ошибки по строкам); при atomic и ошибках транзакция откатывается.
+    """
+    item_ids = {getattr(enrolment, key) for _, enrolment in enrolments}
+    emails = {enrolment.email for _, enrolment in enrolments}
+    parents = set((await db.execute(select(parent.id).where(parent.id.in_(item_ids)))).scalars())
+    users = set((await db.execute(select(User.email).where(User.email.in_(emails)))).scalars())
+
+    errors = []
+    rows = {}
+    for row, enrolment in enrolments:
+        item_key = (enrolment.email, getattr(enrolment, key))
+        if item_key[1] not in parents:
+            errors.append(import_error(row, messages["not_found"]))
+        elif enrolment.email not in users:
+            errors.append(import_error(row, "Пользователь не найден"))
+        elif item_key in rows:
+            errors.append(import_error(row, messages["exists"]))
+        else:
+            rows[item_key] = (row, {"email": enrolment.email, key: item_key[1], "type": enrolment.type, "date": enrolment.date})
+    if not rows:
+        return 0, errors
+
+    statement = (
+        pg_insert(model)
+        .on_conflict_do_nothing(index_elements=[model.email, getattr(model, key)])
+        .returning(model.email, getattr(model, key))
+    )
+    try:
+        # Строки вставляются в порядке ключа, чтобы пакеты с общими записями не блокировали друг друга
+        parameters = [values for _, (_, values) in sorted(rows.items())]
+        created = {tuple(item_key) for item_key in await db.execute(statement, parameters)}
+    except IntegrityError as e:
+        # Экзамен или пользователь удалён после проверки
+        await db.rollback()
+        violation = _foreign_key_violation(e, ["email", key])
+        if violation is None:
+            raise
+        raise violation from e
+    errors += [import_error(row, messages["exists"]) for item_key, (row, _) in rows.items() if item_key not in created]
+
+    # Места занимаются одним условным UPDATE на экзамен: если свободных мест меньше,
+    # чем новых записей, остаются первые по порядку строк, остальные отклоняются
+    # Строки мест блокируются по возрастанию id: параллельные пакеты с общими
+    # экзаменами в разном порядке иначе взаимно блокируются (deadlock)
+    by_item: dict[int, list[tuple[str, int]]] = {}
+    for item_key, (row, _) in rows.items():
+        if item_key in created:
+            by_item.setdefault(item_key[1], []).append((item_key[0], row))
+    for item_id, item_rows in sorted(by_item.items()):
+        seats = await _take_available_seats(db, parent, item_id, len(item_rows))
+        rejected = item_rows[seats:]
+        if not rejected:
+            continue
+        await db.execute(delete(model).where(
+            getattr(model, key) == item_id, model.email.in_([email for email, _ in rejected])
+        ))
+        created.difference_update((email, item_id) for email, _ in rejected)
+        errors += [import_error(row, messages["no_seats"]) for _, row in rejected]
+    return await _finish_import(db, len(created), errors, atomic)
+
+
+ENROLMENT_EXAM_MESSAGES = {
+    "not_found": "Экзамен не найден",
+    "exists": "Запись на этот экзамен уже существует",
+    "no_seats": "Нет свободных мест на экзамене",
+}
+ENROLMENT_RETAKE_MESSAGES = {
+    "not_found": "Пересдача не найдена",
+    "exists": "Запись на эту пересдачу уже существует",
+    "no_seats": "Нет свободных мест на пересдаче",
+}
+
+
+async def create_enrolment_exam(db: AsyncSession, enrolment: EnrolmentExamCreate):
+    return await _insert_enrolment(db, Enrolments_Exams, "exam_id", Exam, enrolment)
+
+
+async def create_enrolment_exams_batch(db: AsyncSession, enrolments: list[EnrolmentExamCreate]) -> list[str | None]:
+    """
+    Создаёт записи на экзамены одной транзакцией (через import_enrolments: проверки
+    и вставка - несколько запросов на весь пакет, места занимаются по экзаменам).
+    Возвращает для каждой записи текст ошибки или None, если запись создана.
+    """
+    _, errors = await import_enrolments(
+        db, Enrolments_Exams, "exam_id", Exam, list(enumerate(enrolments)), atomic=False,
+        messages=ENROLMENT_EXAM_MESSAGES,
+    )
+    result: list[str | None] = [None] * len(enrolments)
+    for error in errors:
+        result[error["row"]] = error["detail"]
+    return result
+
+
 async def get_enrolment_exam_by_email_and_exam_id(db: AsyncSession, email: str, exam_id: int):
     """Проверяет, существует ли запись на экзамен с указанным email и exam_id."""
     result = await db.execute(
@@ -115,16 +468,7 @@ async def get_enrolment_exam_by_email_and_exam_id(db: AsyncSession, email: str,
 
 
 async def create_enrolment_retake(db: AsyncSession, enrolment: EnrolmentRetakeCreate):
-    db_enrolment = Enrolments_Retake(
-        email=enrolment.email,
-        retake_id=enrolment.retake_id,
-        type=enrolment.type,
-        date=enrolment.date
-    )
-    db.add(db_enrolment)
-    await db.commit()
-    await db.refresh(db_enrolment)
-    return db_enrolment
+    return await _insert_enrolment(db, Enrolments_Retake, "retake_id", Retake, enrolment)
 
 
 async def get_enrolment_retake_by_email_and_retake_id(db: AsyncSession, email: str, retake_id: int):
@@ -138,23 +482,11 @@ async def get_enrolment_retake_by_email_and_retake_id(db: AsyncSession, email: s
     return result.scalars().first()
 
 
-async def delete_enrolment_exam(db: AsyncSession, email: str, exam_id: int):
+async def delete_enrolment_exam(db: AsyncSession, email: str, exam_id: int) -> bool:
     """Удаляет запись на экзамен."""
-    enrolment = await get_enrolment_exam_by_email_and_exam_id(db, email, exam_id)
-    if not enrolment:
-        return None
-
-    await db.delete(enrolment)
-    await db.commit()
-    return enrolment
+    return await _delete_enrolment(db, Enrolments_Exams, "exam_id", Exam, email, exam_id)
 
 
-async def delete_enrolment_retake(db: AsyncSession, email: str, retake_id: int):
+async def delete_enrolment_retake(db: AsyncSession, email: str, retake_id: int) -> bool:
     """Удаляет запись на пересдачу."""
-    enrolment = await get_enrolment_retake_by_email_and_retake_id(db, email, retake_id)
-    if not enrolment:
-        return None
-
-    await db.delete(enrolment)
-    await db.commit()
-    return enrolment
+    return await _delete_enrolment(db, Enrolments_Retake, "retake_id", Retake, email, retake_id)
@@ -1,6 +1,8 @@
+import time
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from config import settings
+from tracing import instrument_engine, record_span
 
 # Создаем базовый класс для моделей
 Base = declarative_base()
@@ -10,6 +12,7 @@ Base = declarative_base()
 
 # Создание асинхронного движка для работы с PostgreSQL
 engine = create_async_engine(settings.DATABASE_URL,echo=True)
+instrument_engine(engine)
 
 # Создаем сессию AsyncSession
 AsyncSessionLocal = async_sessionmaker(
@@ -20,5 +23,9 @@ AsyncSessionLocal = async_sessionmaker(
 
 # Асинхронная зависимость для получения сессии
 async def get_db() -> AsyncSession:
-    async with AsyncSessionLocal() as session:
-        yield session  # Возвращаем сессию для использования в запросах
\ No newline at end of file
+    start = time.time()
+    try:
+        async with AsyncSessionLocal() as session:
+            yield session  # Возвращаем сессию для использования в запросах
+    finally:
+        record_span("db_session", start, time.time())
\ No newline at end of file
@@ -0,0 +1,56 @@
+import json
+import logging
+
+import aio_pika
+from aio_pika.abc import AbstractRobustConnection, AbstractExchange
+
+from config import settings
+
+logger = logging.getLogger("backend-db")
+
+CATALOG_EVENTS_EXCHANGE = "catalog_events"
+
+
+class CatalogEventPublisher:
+    """
+    Публикует события изменения каталога (экзамены, пересдачи) в fanout-обмен RabbitMQ.
+    Ошибки публикации не ломают запрос: подписчики защищены TTL своих кэшей,
+    а по пропуску версии (version) перечитывают каталог целиком.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self._connection: AbstractRobustConnection | None = None
+        self._exchange: AbstractExchange | None = None
+
+    async def connect(self):
+        try:
+            self._connection = await aio_pika.connect_robust(self.url)
+            channel = await self._connection.channel()
+            self._exchange = await channel.declare_exchange(
+                CATALOG_EVENTS_EXCHANGE, aio_pika.ExchangeType.FANOUT, durable=True
+            )
+        except Exception as e:
+            logger.error(f"Не удалось подключиться к RabbitMQ для событий каталога: {e}")
+
+    async def close(self):
+        if self._connection is not None:
+            await self._connection.close()
+
+    async def publish(self, entity: str, action: str, data: dict, version: int):
+        if self._exchange is None:
+            logger.warning(f"Событие каталога {entity}/{action} не отправлено: нет подключения к RabbitMQ")
+            return
+        try:
+            await self._exchange.publish(
+                aio_pika.Message(
+                    body=json.dumps({"entity": entity, "action": action, "data": data, "version": version}).encode(),
+                    content_type="application/json",
+                ),
+                routing_key="",
+            )
+        except Exception as e:
+            logger.error(f"Ошибка при публикации события каталога {entity}/{action}: {e}")
+
+
+catalog_events = CatalogEventPublisher(settings.RABBITMQ_URL)
@@ -1,7 +1,10 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from routers import auth, exams, retakes, users, enrolments_exams, enrolments_retake
 from database import engine, Base
+from events import catalog_events
+from routers.auth import password_hasher
+from tracing import span
 from fastapi.middleware.cors import CORSMiddleware
 
 app = FastAPI()
@@ -14,6 +17,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def trace_request(request: Request, call_next):
+    """
+    Спан запроса как продолжение трассы вызывающего сервиса (заголовок traceparent).
+    """
+    with span(f"{request.method} {request.url.path}", traceparent=request.headers.get("traceparent")) as attrs:
+        response = await call_next(request)
+        attrs["status"] = response.status_code
+        return response
+
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(exams.router, prefix="/exams", tags=["exams"])
 app.include_router(retakes.router, prefix="/retakes", tags=["retakes"])
@@ -24,4 +38,12 @@ app.include_router(enrolments_retake.router, prefix="/enrolments-retake", tags=[
 @app.on_event("startup")
 async def startup():
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+        await conn.run_sync(Base.metadata.create_all)
+    await catalog_events.connect()
+    password_hasher.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await catalog_events.close()
+    password_hasher.close()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, CheckConstraint, Index, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -10,7 +10,7 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     email = Column(String, unique=True, index=True, nullable=False)
-    password = Column(String(64), nullable=False)
+    password = Column(String(255), nullable=False)
     created_at = Column(DateTime, server_default=func.now())
 
     exam_enrollments = relationship("Enrolments_Exams", back_populates="user")
@@ -19,20 +19,32 @@ class User(Base):
 
 class Exam(Base):
     __tablename__ = "exams"
+    __table_args__ = (
+        CheckConstraint("enrolled_count >= 0 AND (capacity IS NULL OR enrolled_count <= capacity)", name="ck_exams_seats"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     date = Column(DateTime, nullable=False)
+    # Число мест (None - без ограничения) и число занятых мест, которое ведётся вместе с записями
+    capacity = Column(Integer, nullable=True)
+    enrolled_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     exam_enrollments = relationship("Enrolments_Exams", back_populates="exam")
 
 
 class Retake(Base):
     __tablename__ = "retakes"
+    __table_args__ = (
+        CheckConstraint("enrolled_count >= 0 AND (capacity IS NULL OR enrolled_count <= capacity)", name="ck_retakes_seats"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     date = Column(DateTime, nullable=False)
+    # Число мест (None - без ограничения) и число занятых мест, которое ведётся вместе с записями
+    capacity = Column(Integer, nullable=True)
+    enrolled_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     retake_enrollments = relationship("Enrolments_Retake", back_populates="retake")
 
@@ -59,3 +71,24 @@ class Enrolments_Retake(Base):
 
     user = relationship("User", back_populates="retake_enrollments")
     retake = relationship("Retake", back_populates="retake_enrollments")
+
+
+class CatalogVersion(Base):
+    """Номер версии каталога (exams, retakes): увеличивается при каждом изменении."""
+    __tablename__ = "catalog_versions"
+
+    entity = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+
+class RevokedToken(Base):
+    """Отозванный токен (access или refresh) до истечения его срока (expires_at - unix-время)."""
+    __tablename__ = "revoked_tokens"
+    __table_args__ = (
+        Index("ix_revoked_tokens_type_expires_at", "token_type", "expires_at"),
+    )
+
+    jti = Column(String(64), primary_key=True)
+    email = Column(String, nullable=False)
+    token_type = Column(String(16), nullable=False, server_default="access")
+    expires_at = Column(BigInteger, nullable=False, index=True)
@@ -0,0 +1,75 @@
+import base64
+import json
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+
+# Заголовок ответа с курсором следующей страницы; на последней странице его нет
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: list[type]) -> list:
+    """
+    Значения ключа из курсора; каждое должно иметь тип соответствующего столбца
+    (types), иначе сравнение с ключом упадёт уже в базе.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        values = None
+    if (
+        not isinstance(values, list)
+        or len(values) != len(types)
+        or any(type(value) is not expected for value, expected in zip(values, types))
+    ):
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
+    return values
+
+
+class PageParams:
+    """
+    Параметры страницы списка: limit (не больше PAGE_MAX_LIMIT) и after -
+    курсор из заголовка X-Next-Cursor предыдущей страницы.
+    """
+
+    def __init__(
+        self,
+        limit: int = Query(settings.PAGE_DEFAULT_LIMIT, ge=1, le=settings.PAGE_MAX_LIMIT),
+        after: str | None = Query(None),
+    ):
+        self.limit = limit
+        self.after = after
+
+
+async def fetch_page(db: AsyncSession, query, key_columns: list, limit: int, after: str | None) -> tuple[list, str | None]:
+    """
+    Выполняет query постранично по ключу key_columns (уникальному и покрытому
+    индексом, обычно первичному ключу): до limit записей после курсора after по
+    возрастанию ключа. Возвращает (записи, курсор следующей страницы или None).
+    Запрашивается на одну запись больше, чтобы узнать о следующей странице без COUNT.
+    """
+    if after is not None:
+        values = decode_cursor(after, [column.type.python_type for column in key_columns])
+        if len(key_columns) == 1:
+            query = query.where(key_columns[0] > values[0])
+        else:
+            query = query.where(tuple_(*key_columns) > tuple_(*values))
+    query = query.order_by(*key_columns).limit(limit + 1)
+
+    rows = (await db.execute(query)).scalars().all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor([getattr(rows[-1], column.key) for column in key_columns])
+
+
+def set_next_cursor(response: Response, cursor: str | None):
+    if cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
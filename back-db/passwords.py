@@ -0,0 +1,108 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+SCHEME = "scrypt"
+SALT_BYTES = 16
+KEY_BYTES = 32
+# Хэши, сохранённые до перехода на scrypt: sha256 без соли в hex
+LEGACY_SHA256 = re.compile(r"[0-9a-f]{64}")
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode().rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.b64decode(data + "=" * (-len(data) % 4))
+
+
+def _scrypt(password: str, salt: bytes, log_n: int, r: int, p: int) -> bytes:
+    n = 1 << log_n
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p, dklen=KEY_BYTES,
+        # По умолчанию OpenSSL ограничивает память 32 МБ, этого мало уже при log_n=15
+        maxmem=256 * r * n + (1 << 20),
+    )
+
+
+def hash_password_sync(password: str, log_n: int, r: int, p: int) -> str:
+    """
+    Хэширует пароль scrypt со случайной солью.
+    Формат: scrypt$log_n$r$p$соль$хэш (соль и хэш в base64).
+    """
+    salt = os.urandom(SALT_BYTES)
+    key = _scrypt(password, salt, log_n, r, p)
+    return f"{SCHEME}${log_n}${r}${p}${_b64encode(salt)}${_b64encode(key)}"
+
+
+def verify_password_sync(password: str, stored: str) -> bool:
+    """
+    Проверяет пароль по сохранённому хэшу scrypt или старому sha256.
+    """
+    if LEGACY_SHA256.fullmatch(stored):
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored)
+    try:
+        scheme, log_n, r, p, salt, key = stored.split("$")
+        if scheme != SCHEME:
+            return False
+        expected = _b64decode(key)
+        actual = _scrypt(password, _b64decode(salt), int(log_n), int(r), int(p))
+    except ValueError:
+        return False
+    return hmac.compare_digest(actual, expected)
+
+
+def needs_rehash(stored: str, log_n: int, r: int, p: int) -> bool:
+    """
+    Хэш нужно пересчитать: он старого формата или с другими параметрами стоимости.
+    """
+    return stored.split("$")[:4] != [SCHEME, str(log_n), str(r), str(p)]
+
+
+class PasswordHasher:
+    """
+    Хэширование и проверка паролей в пуле из workers процессов, чтобы scrypt
+    не занимал цикл событий. log_n, r, p - параметры стоимости scrypt для новых
+    хэшей; проверка использует параметры, записанные в самом хэше.
+    """
+
+    def __init__(self, workers: int, log_n: int, r: int = 8, p: int = 1):
+        self.workers = workers
+        self.log_n = log_n
+        self.r = r
+        self.p = p
+        self._pool: ProcessPoolExecutor | None = None
+
+    def start(self):
+        # spawn, а не fork: к моменту первого вызова в процессе уже работают потоки
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    async def _run(self, func, *args):
+        if self._pool is None:
+            self.start()
+        return await asyncio.get_running_loop().run_in_executor(self._pool, func, *args)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password_sync, password, self.log_n, self.r, self.p)
+
+    async def verify(self, password: str, stored: str) -> tuple[bool, bool]:
+        """
+        Возвращает (пароль верен, хэш нужно пересчитать с текущими параметрами).
+        """
+        if LEGACY_SHA256.fullmatch(stored):
+            # sha256 дешевле пересылки в пул
+            valid = verify_password_sync(password, stored)
+        else:
+            valid = await self._run(verify_password_sync, password, stored)
+        return valid, valid and needs_rehash(stored, self.log_n, self.r, self.p)
@@ -1,12 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from schemas import UserCreate, UserResponse, UserLogin
-from crud import create_user, get_user_by_email
+from schemas import UserCreate, UserResponse, UserLogin, RevokedTokenCreate, RevokedTokenResponse
+from crud import create_user, get_user_by_email, set_user_password, revoke_token, get_revoked_tokens
 from database import get_db
-from hashlib import sha256
+from config import settings
+from passwords import PasswordHasher
 
 router = APIRouter()
 
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    log_n=settings.PASSWORD_SCRYPT_LOG_N,
+    r=settings.PASSWORD_SCRYPT_R,
+    p=settings.PASSWORD_SCRYPT_P,
+)
+
 
 @router.post("/registration", response_model=UserResponse)
 async def register_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
@@ -14,8 +24,7 @@ async def register_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
     if existing_user:
         raise HTTPException(status_code=400, detail="Пользователь с таким email уже существует")
 
-    hashed_password = sha256(user.password.encode()).hexdigest()
-    user.password = hashed_password
+    user.password = await password_hasher.hash(user.password)
 
     return await create_user(db, user)
 
@@ -26,8 +35,32 @@ async def login_user(user: UserLogin, db: AsyncSession = Depends(get_db)):
     if not db_user:
         raise HTTPException(status_code=404, detail="Пользователь не найден")
 
-    hashed_password = sha256(user.password.encode()).hexdigest()
-    if db_user.password != hashed_password:
+    valid, rehash = await password_hasher.verify(user.password, db_user.password)
+    if not valid:
         raise HTTPException(status_code=401, detail="Неверный пароль")
 
+    # Старый sha256 или прежняя стоимость: пароль известен только сейчас, пересчитываем хэш
+    if rehash:
+        db_user = await set_user_password(db, db_user, await password_hasher.hash(user.password))
+
     return db_user
+
+
+@router.post("/revocations", status_code=201)
+async def revoke_token_endpoint(token: RevokedTokenCreate, db: AsyncSession = Depends(get_db)):
+    """Отзывает токен; 409, если он уже отозван."""
+    if not await revoke_token(db, token):
+        raise HTTPException(status_code=409, detail="Токен уже отозван")
+    return {"status": "success"}
+
+
+@router.get("/revocations", response_model=list[RevokedTokenResponse])
+async def list_revoked_tokens(
+        token_type: Literal["access", "refresh"] = Query("access"),
+        db: AsyncSession = Depends(get_db),
+):
+    """
+    Отозванные токены типа token_type, срок которых ещё не истёк. Шлюз проверяет
+    только access-токены и загружает только их.
+    """
+    return await get_revoked_tokens(db, token_type)
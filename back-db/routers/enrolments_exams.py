@@ -1,12 +1,23 @@
 from sqlalchemy import select
 from sqlalchemy.orm import joinedload
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Query
-from schemas import EnrolmentExamCreate, EnrolmentExamResponse
-from crud import create_enrolment_exam, get_exam_by_id, get_enrolment_exam_by_email_and_exam_id, delete_enrolment_exam
+from pydantic import ValidationError
+from schemas import EnrolmentExamCreate, EnrolmentExamResponse, EnrolmentBatchResult, ImportReport
+from crud import (
+    ENROLMENT_EXAM_MESSAGES,
+    NoSeatsLeft,
+    ReferenceNotFound,
+    create_enrolment_exam,
+    create_enrolment_exams_batch,
+    delete_enrolment_exam,
+    import_enrolments,
+)
+from bulk import ImportParams, import_report, read_rows
 from database import get_db
-from models import Enrolments_Exams
+from pagination import PageParams, fetch_page, set_next_cursor
+from models import Enrolments_Exams, Exam
 
 router = APIRouter()
 
@@ -14,28 +25,85 @@ router = APIRouter()
 @router.post("/", response_model=EnrolmentExamResponse)
 async def create_enrolment_exam_endpoint(enrolment: EnrolmentExamCreate, db: AsyncSession = Depends(get_db)):
     """Создаёт запись на экзамен."""
-    exam = await get_exam_by_id(db, enrolment.exam_id)
-    if not exam:
+    try:
+        db_enrolment = await create_enrolment_exam(db, enrolment)
+    except ReferenceNotFound as e:
+        if e.column == "email":
+            raise HTTPException(status_code=404, detail="Пользователь не найден")
         raise HTTPException(status_code=404, detail="Экзамен не найден")
-
-    existing_enrolment = await get_enrolment_exam_by_email_and_exam_id(
-        db, enrolment.email, enrolment.exam_id
-    )
-    if existing_enrolment:
+    except NoSeatsLeft:
+        raise HTTPException(status_code=409, detail=ENROLMENT_EXAM_MESSAGES["no_seats"])
+    if db_enrolment is None:
         raise HTTPException(status_code=400, detail="Запись на этот экзамен уже существует")
-
-    db_enrolment = await create_enrolment_exam(db, enrolment)
     return db_enrolment
 
 
+@router.post("/batch", response_model=list[EnrolmentBatchResult])
+async def create_enrolment_exams_batch_endpoint(enrolments: list[dict], db: AsyncSession = Depends(get_db)):
+    """
+    Создаёт пакет записей на экзамены одной транзакцией.
+    Результат возвращается для каждого элемента в том же порядке; ошибка
+    одного элемента не мешает создать остальные.
+    """
+    results: list[dict | None] = []
+    valid: list[tuple[int, EnrolmentExamCreate]] = []
+    for index, item in enumerate(enrolments):
+        try:
+            valid.append((index, EnrolmentExamCreate.model_validate(item)))
+            results.append(None)
+        except ValidationError as e:
+            error = e.errors()[0]
+            results.append({"status": "failed", "detail": f"{'.'.join(map(str, error['loc']))}: {error['msg']}"})
+
+    if valid:
+        try:
+            errors = await create_enrolment_exams_batch(db, [enrolment for _, enrolment in valid])
+        except ReferenceNotFound:
+            raise HTTPException(status_code=409, detail="Данные изменились во время записи, повторите запрос")
+        for (index, _), error in zip(valid, errors):
+            results[index] = {"status": "success"} if error is None else {"status": "failed", "detail": error}
+    return results
+
+
+@router.post("/import", response_model=ImportReport)
+async def import_enrolments_exams_endpoint(
+        request: Request,
+        response: Response,
+        params: ImportParams = Depends(),
+        db: AsyncSession = Depends(get_db),
+):
+    """
+    Импорт записей на экзамены (JSON-массив, NDJSON или CSV с полями email,
+    exam_id, type, date) одной транзакцией с отчётом об ошибках по строкам.
+    """
+    valid, errors = await read_rows(request, EnrolmentExamCreate)
+    total = len(valid) + len(errors)
+    created = 0
+    if valid and not (errors and params.atomic):
+        try:
+            created, import_errors = await import_enrolments(
+                db, Enrolments_Exams, "exam_id", Exam, valid, params.atomic,
+                ENROLMENT_EXAM_MESSAGES,
+            )
+        except ReferenceNotFound:
+            raise HTTPException(status_code=409, detail="Данные изменились во время импорта, повторите запрос")
+        errors += import_errors
+    return import_report(response, params, total, created, errors)
+
+
 @router.get("/", response_model=list[EnrolmentExamResponse])
-async def list_enrolments_exams(email: str = Query(None), db: AsyncSession = Depends(get_db)):
-    """Получает список записей на экзамены."""
+async def list_enrolments_exams(
+        response: Response,
+        email: str = Query(None),
+        page: PageParams = Depends(),
+        db: AsyncSession = Depends(get_db),
+):
+    """Получает страницу списка записей на экзамены (по email и exam_id)."""
     query = select(Enrolments_Exams).options(joinedload(Enrolments_Exams.exam))
     if email:
         query = query.filter(Enrolments_Exams.email == email)
-    result = await db.execute(query)
-    enrolments = result.scalars().all()
+    enrolments, next_cursor = await fetch_page(db, query, [Enrolments_Exams.email, Enrolments_Exams.exam_id], page.limit, page.after)
+    set_next_cursor(response, next_cursor)
 
     response = []
     for enrolment in enrolments:
@@ -57,8 +125,8 @@ async def delete_enrolment_exam_endpoint(
         db: AsyncSession = Depends(get_db)
 ):
     """Удаляет запись на экзамен."""
-    enrolment = await delete_enrolment_exam(db, email, exam_id)
-    if not enrolment:
+    deleted = await delete_enrolment_exam(db, email, exam_id)
+    if not deleted:
         raise HTTPException(status_code=404, detail="Запись на экзамен не найдена")
 
     return {"message": "Запись на экзамен успешно удалена"}
@@ -1,13 +1,21 @@
 from sqlalchemy import select
 from sqlalchemy.orm import joinedload
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Query
-from schemas import EnrolmentRetakeCreate, EnrolmentRetakeResponse
-from crud import create_enrolment_retake, get_retake_by_id, get_enrolment_retake_by_email_and_retake_id, \
-    delete_enrolment_retake
+from schemas import EnrolmentRetakeCreate, EnrolmentRetakeResponse, ImportReport
+from crud import (
+    ENROLMENT_RETAKE_MESSAGES,
+    NoSeatsLeft,
+    ReferenceNotFound,
+    create_enrolment_retake,
+    delete_enrolment_retake,
+    import_enrolments,
+)
+from bulk import ImportParams, import_report, read_rows
 from database import get_db
-from models import Enrolments_Retake
+from pagination import PageParams, fetch_page, set_next_cursor
+from models import Enrolments_Retake, Retake
 
 router = APIRouter()
 
@@ -15,28 +23,58 @@ router = APIRouter()
 @router.post("/", response_model=EnrolmentRetakeResponse)
 async def create_enrolment_retake_endpoint(enrolment: EnrolmentRetakeCreate, db: AsyncSession = Depends(get_db)):
     """Создаёт запись на пересдачу."""
-    retake = await get_retake_by_id(db, enrolment.retake_id)
-    if not retake:
+    try:
+        db_enrolment = await create_enrolment_retake(db, enrolment)
+    except ReferenceNotFound as e:
+        if e.column == "email":
+            raise HTTPException(status_code=404, detail="Пользователь не найден")
         raise HTTPException(status_code=404, detail="Пересдача не найдена")
-
-    existing_enrolment = await get_enrolment_retake_by_email_and_retake_id(
-        db, enrolment.email, enrolment.retake_id
-    )
-    if existing_enrolment:
+    except NoSeatsLeft:
+        raise HTTPException(status_code=409, detail=ENROLMENT_RETAKE_MESSAGES["no_seats"])
+    if db_enrolment is None:
         raise HTTPException(status_code=400, detail="Запись на эту пересдачу уже существует")
-
-    db_enrolment = await create_enrolment_retake(db, enrolment)
     return db_enrolment
 
 
+@router.post("/import", response_model=ImportReport)
+async def import_enrolments_retake_endpoint(
+        request: Request,
+        response: Response,
+        params: ImportParams = Depends(),
+        db: AsyncSession = Depends(get_db),
+):
+    """
+    Импорт записей на пересдачи (JSON-массив, NDJSON или CSV с полями email,
+    retake_id, type, date) одной транзакцией с отчётом об ошибках по строкам.
+    """
+    valid, errors = await read_rows(request, EnrolmentRetakeCreate)
+    total = len(valid) + len(errors)
+    created = 0
+    if valid and not (errors and params.atomic):
+        try:
+            created, import_errors = await import_enrolments(
+                db, Enrolments_Retake, "retake_id", Retake, valid, params.atomic,
+                ENROLMENT_RETAKE_MESSAGES,
+            )
+        except ReferenceNotFound:
+            raise HTTPException(status_code=409, detail="Данные изменились во время импорта, повторите запрос")
+        errors += import_errors
+    return import_report(response, params, total, created, errors)
+
+
 @router.get("/", response_model=list[EnrolmentRetakeResponse])
-async def list_enrolments_retake(email: str = Query(None), db: AsyncSession = Depends(get_db)):
-    """Получает список записей на пересдачи."""
+async def list_enrolments_retake(
+        response: Response,
+        email: str = Query(None),
+        page: PageParams = Depends(),
+        db: AsyncSession = Depends(get_db),
+):
+    """Получает страницу списка записей на пересдачи (по email и retake_id)."""
     query = select(Enrolments_Retake).options(joinedload(Enrolments_Retake.retake))
     if email:
         query = query.filter(Enrolments_Retake.email == email)
-    result = await db.execute(query)
-    enrolments = result.scalars().all()
+    enrolments, next_cursor = await fetch_page(db, query, [Enrolments_Retake.email, Enrolments_Retake.retake_id], page.limit, page.after)
+    set_next_cursor(response, next_cursor)
 
     response = []
     for enrolment in enrolments:
@@ -58,8 +96,8 @@ async def delete_enrolment_retake_endpoint(
         db: AsyncSession = Depends(get_db)
 ):
     """Удаляет запись на пересдачу."""
-    enrolment = await delete_enrolment_retake(db, email, retake_id)
-    if not enrolment:
+    deleted = await delete_enrolment_retake(db, email, retake_id)
+    if not deleted:
         raise HTTPException(status_code=404, detail="Запись на пересдачу не найдена")
 
     return {"message": "Запись на пересдачу успешно удалена"}
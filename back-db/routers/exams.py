@@ -1,20 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from schemas import ExamCreate, ExamResponse
-from crud import create_exam, get_exams
+from schemas import ExamCreate, ExamResponse, ImportReport, ExamCatalogSnapshot, SeatsResponse
+from crud import create_exam, get_exams, get_catalog_snapshot, get_seats, import_catalog
+from bulk import ImportParams, import_report, read_rows
 from database import get_db
+from pagination import PageParams, set_next_cursor
+from events import catalog_events
+from models import Exam
 
 router = APIRouter()
 
 
 @router.post("/", response_model=ExamResponse)
 async def create_exam_endpoint(exam: ExamCreate, db: AsyncSession = Depends(get_db)):
-    db_exam = await create_exam(db, exam)
+    db_exam, version = await create_exam(db, exam)
     if not db_exam:
         raise HTTPException(status_code=400, detail="Exam could not be created")
+    await catalog_events.publish("exams", "created", ExamResponse.model_validate(db_exam).model_dump(), version)
     return db_exam
 
 
+@router.post("/import", response_model=ImportReport)
+async def import_exams_endpoint(
+        request: Request,
+        response: Response,
+        params: ImportParams = Depends(),
+        db: AsyncSession = Depends(get_db),
+):
+    """
+    Импорт экзаменов (JSON-массив, NDJSON или CSV с полями name, date) одной
+    транзакцией. Подписчики каталога получают одно событие imported со всеми записями.
+    """
+    valid, errors = await read_rows(request, ExamCreate)
+    created = []
+    if valid and not (errors and params.atomic):
+        created, version = await import_catalog(db, Exam, "exams", [item for _, item in valid])
+        await catalog_events.publish(
+            "exams", "imported", {"items": [ExamResponse.model_validate(item).model_dump() for item in created]}, version
+        )
+    return import_report(response, params, len(valid) + len(errors), len(created), errors)
+
+
 @router.get("/", response_model=list[ExamResponse])
-async def list_exams(db: AsyncSession = Depends(get_db)):
-    return await get_exams(db)
+async def list_exams(response: Response, page: PageParams = Depends(), db: AsyncSession = Depends(get_db)):
+    items, next_cursor = await get_exams(db, page.limit, page.after)
+    set_next_cursor(response, next_cursor)
+    return items
+
+
+@router.get("/snapshot", response_model=ExamCatalogSnapshot)
+async def exam_catalog_snapshot(db: AsyncSession = Depends(get_db)):
+    """Каталог вместе с его версией: по нему подписчики событий каталога восстанавливают копию."""
+    version, items = await get_catalog_snapshot(db, Exam, "exams")
+    return {"version": version, "items": items}
+
+
+@router.get("/{exam_id}/seats", response_model=SeatsResponse)
+async def exam_seats(exam_id: int, response: Response, db: AsyncSession = Depends(get_db)):
+    """Занятые и свободные места: читаются из базы при каждом запросе, без кэширования."""
+    seats = await get_seats(db, Exam, exam_id)
+    if seats is None:
+        raise HTTPException(status_code=404, detail="Экзамен не найден")
+    response.headers["Cache-Control"] = "no-store"
+    return seats
@@ -1,20 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from schemas import RetakeCreate, RetakeResponse
-from crud import create_retake, get_retakes
+from schemas import RetakeCreate, RetakeResponse, ImportReport, RetakeCatalogSnapshot, SeatsResponse
+from crud import create_retake, get_retakes, get_catalog_snapshot, get_seats, import_catalog
+from bulk import ImportParams, import_report, read_rows
 from database import get_db
+from pagination import PageParams, set_next_cursor
+from events import catalog_events
+from models import Retake
 
 router = APIRouter()
 
 
 @router.post("/", response_model=RetakeResponse)
 async def create_retake_endpoint(retake: RetakeCreate, db: AsyncSession = Depends(get_db)):
-    db_retake = await create_retake(db, retake)
+    db_retake, version = await create_retake(db, retake)
     if not db_retake:
         raise HTTPException(status_code=400, detail="Retake could not be created")
+    await catalog_events.publish("retakes", "created", RetakeResponse.model_validate(db_retake).model_dump(), version)
     return db_retake
 
 
+@router.post("/import", response_model=ImportReport)
+async def import_retakes_endpoint(
+        request: Request,
+        response: Response,
+        params: ImportParams = Depends(),
+        db: AsyncSession = Depends(get_db),
+):
+    """
+    Импорт пересдач (JSON-массив, NDJSON или CSV с полями name, date) одной
+    транзакцией. Подписчики каталога получают одно событие imported со всеми записями.
+    """
+    valid, errors = await read_rows(request, RetakeCreate)
+    created = []
+    if valid and not (errors and params.atomic):
+        created, version = await import_catalog(db, Retake, "retakes", [item for _, item in valid])
+        await catalog_events.publish(
+            "retakes", "imported", {"items": [RetakeResponse.model_validate(item).model_dump() for item in created]}, version
+        )
+    return import_report(response, params, len(valid) + len(errors), len(created), errors)
+
+
 @router.get("/", response_model=list[RetakeResponse])
-async def list_retakes(db: AsyncSession = Depends(get_db)):
-    return await get_retakes(db)
+async def list_retakes(response: Response, page: PageParams = Depends(), db: AsyncSession = Depends(get_db)):
+    items, next_cursor = await get_retakes(db, page.limit, page.after)
+    set_next_cursor(response, next_cursor)
+    return items
+
+
+@router.get("/snapshot", response_model=RetakeCatalogSnapshot)
+async def retake_catalog_snapshot(db: AsyncSession = Depends(get_db)):
+    """Каталог вместе с его версией: по нему подписчики событий каталога восстанавливают копию."""
+    version, items = await get_catalog_snapshot(db, Retake, "retakes")
+    return {"version": version, "items": items}
+
+
+@router.get("/{retake_id}/seats", response_model=SeatsResponse)
+async def retake_seats(retake_id: int, response: Response, db: AsyncSession = Depends(get_db)):
+    """Занятые и свободные места: читаются из базы при каждом запросе, без кэширования."""
+    seats = await get_seats(db, Retake, retake_id)
+    if seats is None:
+        raise HTTPException(status_code=404, detail="Пересдача не найдена")
+    response.headers["Cache-Control"] = "no-store"
+    return seats
@@ -1,8 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from schemas import UserCreate, UserResponse, UserUpdate
-from crud import create_user, get_users, get_user_by_id, update_user, delete_user, get_user_by_email
+from schemas import UserCreate, UserResponse, UserUpdate, ImportReport
+from crud import create_user, get_users, get_user_by_id, update_user, delete_user, get_user_by_email, import_users
+from bulk import ImportParams, import_report, read_rows
 from database import get_db
+from pagination import PageParams, set_next_cursor
+from routers.auth import password_hasher
 
 router = APIRouter()
 
@@ -16,10 +21,35 @@ async def create_user_endpoint(user: UserCreate, db: AsyncSession = Depends(get_
     return await create_user(db, user)
 
 
+@router.post("/import", response_model=ImportReport)
+async def import_users_endpoint(
+        request: Request,
+        response: Response,
+        params: ImportParams = Depends(),
+        db: AsyncSession = Depends(get_db),
+):
+    """
+    Импорт пользователей (JSON-массив, NDJSON или CSV с полями name, email,
+    password) одной транзакцией. Пароли хэшируются в пуле процессов до начала записи.
+    """
+    valid, errors = await read_rows(request, UserCreate)
+    total = len(valid) + len(errors)
+    created = 0
+    if valid and not (errors and params.atomic):
+        hashes = await asyncio.gather(*(password_hasher.hash(user.password) for _, user in valid))
+        for (_, user), password in zip(valid, hashes):
+            user.password = password
+        created, import_errors = await import_users(db, valid, params.atomic)
+        errors += import_errors
+    return import_report(response, params, total, created, errors)
+
+
 @router.get("/", response_model=list[UserResponse])
-async def list_users(db: AsyncSession = Depends(get_db)):
-    """Получает список всех пользователей."""
-    return await get_users(db)
+async def list_users(response: Response, page: PageParams = Depends(), db: AsyncSession = Depends(get_db)):
+    """Получает страницу списка пользователей."""
+    users, next_cursor = await get_users(db, page.limit, page.after)
+    set_next_cursor(response, next_cursor)
+    return users
 
 
 @router.get("/{user_id}", response_model=UserResponse)
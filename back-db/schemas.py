@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr, validator
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field, validator
+from typing import Literal, Optional
 from datetime import datetime, date
 
 
@@ -32,16 +32,24 @@ class UserLogin(BaseModel):
 class ExamCreate(BaseModel):
     name: str
     date: str
+    # Число мест; None - без ограничения
+    capacity: Optional[int] = Field(None, ge=0)
 
     @validator("date")
     def parse_date(cls, value):
         return datetime.strptime(value, "%d-%m-%Y").date()
 
+    @validator("capacity", pre=True)
+    def empty_capacity(cls, value):
+        # Пустая ячейка CSV при импорте
+        return None if value == "" else value
+
 
 class ExamResponse(BaseModel):
     id: int
     name: str
     date: str
+    capacity: Optional[int] = None
 
     @validator("date", pre=True)
     def format_date(cls, value):
@@ -53,19 +61,46 @@ class ExamResponse(BaseModel):
         from_attributes = True
 
 
+class ExamCatalogSnapshot(BaseModel):
+    version: int
+    items: list[ExamResponse]
+
+
+class SeatsResponse(BaseModel):
+    """
+    Занятые места экзамена или пересдачи. Меняются при каждой записи, поэтому не
+    входят в каталог (ExamResponse, RetakeResponse), который кэшируется шлюзом и деканатом.
+    """
+    id: int
+    capacity: Optional[int] = None
+    enrolled_count: int
+    available: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+
 class RetakeCreate(BaseModel):
     name: str
     date: str
+    # Число мест; None - без ограничения
+    capacity: Optional[int] = Field(None, ge=0)
 
     @validator("date")
     def parse_date(cls, value):
         return datetime.strptime(value, "%d-%m-%Y").date()
 
+    @validator("capacity", pre=True)
+    def empty_capacity(cls, value):
+        # Пустая ячейка CSV при импорте
+        return None if value == "" else value
+
 
 class RetakeResponse(BaseModel):
     id: int
     name: str
     date: str
+    capacity: Optional[int] = None
 
     @validator("date", pre=True)
     def format_date(cls, value):
@@ -77,6 +112,11 @@ class RetakeResponse(BaseModel):
         from_attributes = True
 
 
+class RetakeCatalogSnapshot(BaseModel):
+    version: int
+    items: list[RetakeResponse]
+
+
 class EnrolmentExamCreate(BaseModel):
     email: EmailStr
     exam_id: int
@@ -105,6 +145,23 @@ class EnrolmentExamResponse(BaseModel):
         from_attributes = True
 
 
+class EnrolmentBatchResult(BaseModel):
+    status: str
+    detail: Optional[str] = None
+
+
+class ImportRowError(BaseModel):
+    row: int
+    detail: str
+
+
+class ImportReport(BaseModel):
+    total: int
+    created: int
+    failed: int
+    errors: list[ImportRowError]
+
+
 class EnrolmentRetakeCreate(BaseModel):
     email: EmailStr
     retake_id: int
@@ -131,3 +188,18 @@ class EnrolmentRetakeResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class RevokedTokenCreate(BaseModel):
+    jti: str
+    email: EmailStr
+    token_type: Literal["access", "refresh"] = "access"
+    expires_at: int
+
+
+class RevokedTokenResponse(BaseModel):
+    jti: str
+    expires_at: int
+
+    class Config:
+        from_attributes = True
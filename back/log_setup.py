@@ -0,0 +1,119 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+
+from tracing import current_traceparent
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# json - структурированные записи, text - прежний человекочитаемый формат
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+# Размер очереди записей; при переполнении новые записи отбрасываются, а не блокируют цикл событий
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+# Тела сообщений выше уровня DEBUG: максимальная длина и доля записей, в которые они попадают
+LOG_PAYLOAD_LIMIT = int(os.getenv("LOG_PAYLOAD_LIMIT", 256))
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", 0.1))
+
+SENSITIVE_KEYS = {"password", "refresh_token", "access_token"}
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+def _redact(data):
+    if isinstance(data, dict):
+        return {key: "***" if key in SENSITIVE_KEYS else _redact(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_redact(item) for item in data]
+    return data
+
+
+class Payload:
+    """
+    Ленивое представление тела сообщения для логов.
+
+    Сериализуется только при форматировании записи (в фоновом потоке), пароли
+    и токены маскируются. На уровне DEBUG тело выводится целиком, выше -
+    только в доле записей LOG_PAYLOAD_SAMPLE_RATE и не длиннее LOG_PAYLOAD_LIMIT.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __str__(self):
+        full = logging.getLogger().isEnabledFor(logging.DEBUG)
+        if not full and random.random() >= LOG_PAYLOAD_SAMPLE_RATE:
+            return "<payload sampled out>"
+
+        data = self.data
+        if isinstance(data, bytes):
+            try:
+                data = json.loads(data)
+            except ValueError:
+                data = data.decode(errors="replace")
+        text = json.dumps(_redact(data), ensure_ascii=False, default=str)
+        if not full and len(text) > LOG_PAYLOAD_LIMIT:
+            return f"{text[:LOG_PAYLOAD_LIMIT]}... ({len(text)} chars)"
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        traceparent = getattr(record, "traceparent", None)
+        if traceparent:
+            entry["traceparent"] = traceparent
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Кладёт запись в очередь без форматирования: сообщение собирается в потоке
+    QueueListener. В вызывающем потоке запоминается только контекст трассировки.
+    """
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.traceparent = current_traceparent()
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            NonBlockingQueueHandler.dropped += 1
+
+
+def _make_non_blocking(logger: logging.Logger, handlers: list[logging.Handler]):
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    logger.handlers = [NonBlockingQueueHandler(log_queue)]
+    listener.start()
+    atexit.register(listener.stop)
+
+
+def setup_logging():
+    """
+    Настраивает запись логов (и экспорт спанов трассировки) через очередь и фоновый поток.
+    """
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    _make_non_blocking(root, [handler])
+
+    traces = logging.getLogger("traces")
+    if traces.handlers:
+        _make_non_blocking(traces, list(traces.handlers))
@@ -0,0 +1,75 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+CATALOG_CACHE_REQUESTS = Counter(
+    "gateway_catalog_cache_requests_total",
+    "Обращения к кэшу каталога (result: hit, stale, miss)",
+    ["key", "result"],
+)
+CATALOG_CACHE_INVALIDATIONS = Counter(
+    "gateway_catalog_cache_invalidations_total",
+    "Инвалидации кэша каталога",
+    ["key"],
+)
+SINGLEFLIGHT_CALLS = Counter(
+    "gateway_singleflight_calls_total",
+    "Одинаковые параллельные RPC-чтения (role: leader - выполненные, merged - присоединившиеся)",
+    ["queue", "role"],
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "gateway_admission_in_flight",
+    "Выполняющиеся RPC-вызовы по классам маршрутов",
+    ["route_class"],
+)
+ADMISSION_WAITING = Gauge(
+    "gateway_admission_waiting",
+    "RPC-вызовы, ожидающие свободного слота, по классам маршрутов",
+    ["route_class"],
+)
+ADMISSION_REJECTED = Counter(
+    "gateway_admission_rejected_total",
+    "Отклонённые из-за перегрузки запросы (reason: queue_full, wait_timeout)",
+    ["route_class", "reason"],
+)
+RPC_CONNECT_SECONDS = Histogram(
+    "gateway_rpc_connect_seconds",
+    "Время получения канала из пула (включая открытие соединения и канала)",
+    ["queue"],
+)
+RPC_PUBLISH_SECONDS = Histogram(
+    "gateway_rpc_publish_seconds",
+    "Время публикации запроса в очередь",
+    ["queue"],
+)
+RPC_REPLY_SECONDS = Histogram(
+    "gateway_rpc_reply_seconds",
+    "Время от публикации запроса до получения ответа",
+    ["queue"],
+)
+RPC_REPLIES = Counter(
+    "gateway_rpc_replies_total",
+    "Результаты RPC-вызовов (status: success, failed, error, timeout, exception)",
+    ["queue", "status"],
+)
+RPC_IN_FLIGHT = Gauge(
+    "gateway_rpc_in_flight",
+    "RPC-вызовы, ожидающие ответа",
+    ["queue"],
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "gateway_http_request_seconds",
+    "Время обработки HTTP-запроса",
+    ["method", "route", "status"],
+)
+HTTP_IN_FLIGHT = Gauge(
+    "gateway_http_in_flight",
+    "Обрабатываемые HTTP-запросы",
+)
+AUTH_TOKEN_CHECKS = Counter(
+    "gateway_auth_token_checks_total",
+    "Проверки токенов сессии (result: valid, anonymous, missing, invalid, expired, revoked, forbidden)",
+    ["result"],
+)
+AUTH_REVOKED_TOKENS = Gauge(
+    "gateway_auth_revoked_tokens",
+    "Отозванные токены с неистёкшим сроком в локальном списке отзыва",
+)
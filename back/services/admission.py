@@ -0,0 +1,63 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from metrics import ADMISSION_IN_FLIGHT, ADMISSION_REJECTED, ADMISSION_WAITING
+
+
+class AdmissionRejected(Exception):
+    """
+    Запрос отклонён: бюджет одновременных RPC-вызовов класса маршрутов исчерпан.
+    """
+
+    def __init__(self, route_class: str, retry_after: int):
+        super().__init__(route_class)
+        self.route_class = route_class
+        self.retry_after = retry_after
+
+
+class AdmissionLimiter:
+    """
+    Ограничивает число одновременных RPC-вызовов одного класса маршрутов.
+
+    Сверх max_in_flight запросы ждут в очереди длиной не более max_waiting
+    и не дольше wait_timeout секунд. Если очередь заполнена или ожидание
+    истекло, запрос сразу отклоняется с AdmissionRejected.
+    """
+
+    def __init__(self, route_class: str, max_in_flight: int, max_waiting: int, wait_timeout: float, retry_after: int):
+        self.route_class = route_class
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.retry_after = retry_after
+
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._waiting = 0
+
+    def _reject(self, reason: str):
+        ADMISSION_REJECTED.labels(route_class=self.route_class, reason=reason).inc()
+        raise AdmissionRejected(self.route_class, self.retry_after)
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._semaphore.locked():
+            if self._waiting >= self.max_waiting:
+                self._reject("queue_full")
+
+            self._waiting += 1
+            ADMISSION_WAITING.labels(route_class=self.route_class).inc()
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.wait_timeout)
+            except asyncio.TimeoutError:
+                self._reject("wait_timeout")
+            finally:
+                self._waiting -= 1
+                ADMISSION_WAITING.labels(route_class=self.route_class).dec()
+        else:
+            await self._semaphore.acquire()
+
+        ADMISSION_IN_FLIGHT.labels(route_class=self.route_class).inc()
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+            ADMISSION_IN_FLIGHT.labels(route_class=self.route_class).dec()
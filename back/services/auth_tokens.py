@@ -0,0 +1,133 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import time
+from typing import Awaitable, Callable
+
+from metrics import AUTH_REVOKED_TOKENS, AUTH_TOKEN_CHECKS
+
+logger = logging.getLogger("backend-service")
+
+
+class TokenRejected(Exception):
+    """
+    Запрос не прошёл проверку токена: status_code 401 (нет токена или он
+    недействителен) или 403 (токен другого пользователя).
+    """
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+def parse_signing_keys(value: str) -> dict[str, bytes]:
+    """
+    Ключи проверки из строки "kid1:secret1,kid2:secret2" (та же переменная, что у сервиса auth).
+    """
+    keys = {}
+    for item in value.split(","):
+        if item.strip():
+            kid, _, secret = item.strip().partition(":")
+            keys[kid] = secret.encode()
+    return keys
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class TokenVerifier:
+    """
+    Проверяет access-токены (JWT HS256, выданные сервисом auth) на месте, без
+    обращения к брокеру: подпись - общим ключом, затем срок действия и локальный
+    список отзыва. Список отзыва периодически синхронизируется с auth, поэтому
+    токен, отозванный через другой экземпляр шлюза, перестаёт приниматься с
+    задержкой до одного интервала синхронизации.
+
+    При required=False запросы без токена пропускаются как раньше (переходный
+    режим для клиентов, ещё не передающих токен); присланный токен проверяется всегда.
+    """
+
+    def __init__(self, keys: dict[str, bytes], required: bool):
+        self.keys = keys
+        self.required = required
+        # jti -> exp: отозванные токены до истечения их срока
+        self._revoked: dict[str, int] = {}
+
+    def _reject(self, result: str, status_code: int, message: str):
+        AUTH_TOKEN_CHECKS.labels(result=result).inc()
+        raise TokenRejected(status_code, message)
+
+    def verify(self, token: str) -> dict:
+        """
+        Возвращает claims действительного access-токена, иначе выбрасывает TokenRejected.
+        """
+        try:
+            header_b64, claims_b64, signature_b64 = token.split(".")
+            header = json.loads(_b64decode(header_b64))
+            key = self.keys.get(header.get("kid"))
+            if key is None or header.get("alg") != "HS256":
+                self._reject("invalid", 401, "Недействительный токен")
+            expected = hmac.new(key, f"{header_b64}.{claims_b64}".encode(), hashlib.sha256).digest()
+            if not hmac.compare_digest(expected, _b64decode(signature_b64)):
+                self._reject("invalid", 401, "Недействительный токен")
+            claims = json.loads(_b64decode(claims_b64))
+            if claims.get("typ") != "access":
+                self._reject("invalid", 401, "Недействительный токен")
+        except (ValueError, TypeError, AttributeError):
+            self._reject("invalid", 401, "Недействительный токен")
+        if claims.get("exp", 0) <= time.time():
+            self._reject("expired", 401, "Срок действия токена истёк")
+        if claims.get("jti") in self._revoked:
+            self._reject("revoked", 401, "Токен отозван")
+        return claims
+
+    def authenticate(self, authorization: str | None, email: str | None) -> dict | None:
+        """
+        Проверяет заголовок Authorization ("Bearer <token>") и что токен выдан
+        пользователю email, от имени которого выполняется запрос.
+        Возвращает claims или None для запроса без токена в переходном режиме.
+        """
+        scheme, _, token = (authorization or "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            if self.required:
+                self._reject("missing", 401, "Требуется авторизация")
+            AUTH_TOKEN_CHECKS.labels(result="anonymous").inc()
+            return None
+
+        claims = self.verify(token.strip())
+        if email is not None and str(claims.get("sub", "")).lower() != str(email).strip().lower():
+            self._reject("forbidden", 403, "Нет доступа к данным другого пользователя")
+        AUTH_TOKEN_CHECKS.labels(result="valid").inc()
+        return claims
+
+    def revoke(self, jti: str, expires_at: int):
+        self._revoked[jti] = expires_at
+        AUTH_REVOKED_TOKENS.set(len(self._revoked))
+
+    def update_revocations(self, revocations: list[dict]):
+        """
+        Добавляет отозванные токены из auth и забывает истёкшие. Отзыв не
+        отменяется, поэтому локальные записи, которых ещё нет в ответе, сохраняются.
+        """
+        for item in revocations:
+            self._revoked[item["jti"]] = int(item["expires_at"])
+        now = time.time()
+        self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+        AUTH_REVOKED_TOKENS.set(len(self._revoked))
+
+    async def sync_revocations(self, fetch: Callable[[], Awaitable[list[dict]]], interval: float):
+        """
+        Каждые interval секунд загружает список отзыва через fetch. При ошибке
+        остаётся прежний список.
+        """
+        while True:
+            try:
+                self.update_revocations(await fetch())
+            except Exception as e:
+                logger.warning("Не удалось обновить список отозванных токенов: %s", e)
+            await asyncio.sleep(interval)
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from metrics import CATALOG_CACHE_INVALIDATIONS, CATALOG_CACHE_REQUESTS
+
+logger = logging.getLogger("backend-service")
+
+
+class CatalogCache:
+    """
+    Read-through кэш каталога экзаменов и пересдач в памяти шлюза.
+
+    Запись свежая ttl секунд. Ещё stale_ttl секунд после этого она отдаётся
+    как устаревшая, а в фоне запускается обновление (stale-while-revalidate).
+    Число записей ограничено max_size, лишние вытесняются по LRU.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        stale_ttl: float,
+        max_size: int,
+        should_cache: Callable[[dict], bool] = lambda value: True,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_size = max_size
+        self.should_cache = should_cache
+
+        # key -> (value, fresh_until, stale_until)
+        self._entries: OrderedDict[str, tuple[dict, float, float]] = OrderedDict()
+        self._refreshing: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+        # Поколение ключа увеличивается при его инвалидации, чтобы загрузка,
+        # начатая до инвалидации, не положила в кэш устаревшие данные. Поколения
+        # раздельные: инвалидация одного ключа не отбрасывает загрузку другого.
+        self._generations: dict[str, int] = {}
+        # Общее поколение для инвалидации всех ключей сразу
+        self._global_generation = 0
+
+    async def get(self, key: str, loader: Callable[[], Awaitable[dict]]) -> dict:
+        """
+        Возвращает значение из кэша или загружает его через loader.
+        """
+        now = time.monotonic()
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            value, fresh_until, stale_until = entry
+            if now < fresh_until:
+                self._entries.move_to_end(key)
+                CATALOG_CACHE_REQUESTS.labels(key=key, result="hit").inc()
+                return value
+            if now < stale_until:
+                self._entries.move_to_end(key)
+                CATALOG_CACHE_REQUESTS.labels(key=key, result="stale").inc()
+                self._schedule_refresh(key, loader)
+                return value
+
+        CATALOG_CACHE_REQUESTS.labels(key=key, result="miss").inc()
+        return await self._load(key, loader)
+
+    def invalidate(self, key: str | None = None):
+        """
+        Удаляет запись key (или все записи, если key не указан).
+        """
+        if key is None:
+            self._global_generation += 1
+            self._entries.clear()
+        else:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            self._entries.pop(key, None)
+        CATALOG_CACHE_INVALIDATIONS.labels(key=key or "*").inc()
+        logger.info("Кэш каталога инвалидирован: %s", key or 'все записи')
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[dict]]) -> dict:
+        generation = self._generation(key)
+        value = await loader()
+        if self.should_cache(value) and generation == self._generation(key):
+            now = time.monotonic()
+            self._entries[key] = (value, now + self.ttl, now + self.ttl + self.stale_ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return value
+
+    def _generation(self, key: str) -> tuple[int, int]:
+        return self._global_generation, self._generations.get(key, 0)
+
+    def _schedule_refresh(self, key: str, loader: Callable[[], Awaitable[dict]]):
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        task = asyncio.create_task(self._refresh(key, loader))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, key: str, loader: Callable[[], Awaitable[dict]]):
+        try:
+            await self._load(key, loader)
+        except Exception as e:
+            logger.error("Ошибка фонового обновления кэша каталога для %s: %s", key, e)
+        finally:
+            self._refreshing.discard(key)
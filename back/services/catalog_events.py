@@ -0,0 +1,48 @@
+import json
+import logging
+import uuid
+from typing import Awaitable, Callable
+
+import aio_pika
+from aio_pika.abc import AbstractIncomingMessage, AbstractRobustConnection
+
+logger = logging.getLogger("backend-service")
+
+CATALOG_EVENTS_EXCHANGE = "catalog_events"
+
+
+async def subscribe_to_catalog_events(
+    url: str,
+    on_event: Callable[[dict], Awaitable[None]],
+    on_reconnect: Callable[[], None],
+) -> AbstractRobustConnection:
+    """
+    Подписывается на fanout-обмен с событиями изменения каталога от backend-db.
+
+    События, пришедшие пока соединение было разорвано, теряются, поэтому
+    после переподключения вызывается on_reconnect.
+    """
+    connection = await aio_pika.connect_robust(url)
+    connection.reconnect_callbacks.add(lambda *args: on_reconnect())
+
+    channel = await connection.channel()
+    exchange = await channel.declare_exchange(
+        CATALOG_EVENTS_EXCHANGE, aio_pika.ExchangeType.FANOUT, durable=True
+    )
+    queue = await channel.declare_queue(
+        f"gateway.catalog_events.{uuid.uuid4().hex}",
+        exclusive=True,
+        auto_delete=True,
+    )
+    await queue.bind(exchange)
+
+    async def on_message(message: AbstractIncomingMessage):
+        async with message.process():
+            try:
+                await on_event(json.loads(message.body))
+            except Exception as e:
+                logger.error("Ошибка обработки события каталога: %s", e, exc_info=True)
+
+    await queue.consume(on_message)
+    logger.info("Подписка на события каталога оформлена")
+    return connection
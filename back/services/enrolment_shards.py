@@ -0,0 +1,27 @@
+import zlib
+
+# Изменения записей студента (запись и отмена на экзамены и пересдачи) идут
+# в одну из N очередей-шардов по хэшу email. У каждого шарда один активный
+# потребитель, и сообщения одного студента он обрабатывает по одному, поэтому
+# операции студента выполняются в порядке отправки. Деканат объявляет очереди
+# с теми же аргументами.
+ENROLMENT_SHARD_QUEUE_PREFIX = "enrolment_mutations."
+ENROLMENT_SHARD_QUEUE_ARGUMENTS = {"x-single-active-consumer": True}
+
+
+def shard_index(email: str, shards: int) -> int:
+    """
+    Номер шарда для email. crc32 стабилен между процессами и версиями Python (в отличие от hash()).
+    """
+    return zlib.crc32(email.strip().lower().encode()) % shards
+
+
+def shard_queue(email: str, shards: int) -> str:
+    return f"{ENROLMENT_SHARD_QUEUE_PREFIX}{shard_index(email, shards)}"
+
+
+def shard_message(operation: str, data: dict) -> dict:
+    """
+    Оборачивает сообщение: operation - имя прежней очереди операции (например, enroll_to_exam_queue).
+    """
+    return {"operation": operation, "data": data}
@@ -0,0 +1,164 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+
+import aio_pika
+from aio_pika.abc import AbstractChannel, AbstractIncomingMessage, AbstractRobustConnection
+from aio_pika.pool import Pool
+
+from metrics import RPC_CONNECT_SECONDS, RPC_IN_FLIGHT, RPC_PUBLISH_SECONDS, RPC_REPLIES, RPC_REPLY_SECONDS
+from tracing import current_traceparent, span
+
+logger = logging.getLogger("backend-service")
+
+
+class RpcTimeoutError(Exception):
+    """
+    Ответ на RPC-запрос не пришёл до истечения дедлайна.
+    """
+
+
+class RpcClient:
+    """
+    Долгоживущий RPC-клиент поверх RabbitMQ.
+
+    Держит пул соединений и каналов для публикации запросов и одну
+    эксклюзивную auto-delete очередь ответов. Ответы раздаются ожидающим
+    запросам через словарь asyncio.Future по correlation_id.
+    """
+
+    def __init__(self, url: str, connection_pool_size: int = 2, channel_pool_size: int = 10):
+        self.url = url
+        self.connection_pool_size = connection_pool_size
+        self.channel_pool_size = channel_pool_size
+
+        self._connection_pool: Pool | None = None
+        self._channel_pool: Pool | None = None
+        self._reply_connection: AbstractRobustConnection | None = None
+        self._reply_queue = None
+        self._declared_queues: set[str] = set()
+        self._futures: dict[str, asyncio.Future] = {}
+
+    async def _get_connection(self) -> AbstractRobustConnection:
+        return await aio_pika.connect_robust(self.url)
+
+    async def _get_channel(self) -> AbstractChannel:
+        async with self._connection_pool.acquire() as connection:
+            return await connection.channel()
+
+    async def connect(self):
+        """
+        Открывает пулы соединений и каналов и подписывается на очередь ответов.
+        """
+        self._connection_pool = Pool(self._get_connection, max_size=self.connection_pool_size)
+        self._channel_pool = Pool(self._get_channel, max_size=self.channel_pool_size)
+
+        # Очередь ответов слушаем через отдельное соединение, чтобы публикации
+        # из пула не конкурировали с доставкой ответов.
+        self._reply_connection = await aio_pika.connect_robust(self.url)
+        channel = await self._reply_connection.channel()
+        self._reply_queue = await channel.declare_queue(
+            f"gateway.rpc.reply.{uuid.uuid4().hex}",
+            exclusive=True,
+            auto_delete=True,
+        )
+        await self._reply_queue.consume(self._on_response, no_ack=True)
+        logger.info("RPC-клиент подключен, очередь ответов: %s", self._reply_queue.name)
+
+    async def close(self):
+        """
+        Закрывает соединения и отменяет все ожидающие запросы.
+        """
+        for future in self._futures.values():
+            if not future.done():
+                future.cancel()
+        self._futures.clear()
+
+        if self._reply_connection is not None:
+            await self._reply_connection.close()
+        if self._channel_pool is not None:
+            await self._channel_pool.close()
+        if self._connection_pool is not None:
+            await self._connection_pool.close()
+        logger.info("RPC-клиент остановлен")
+
+    async def _on_response(self, message: AbstractIncomingMessage):
+        future = self._futures.pop(message.correlation_id, None)
+        if future is None:
+            logger.warning("Получен ответ с неизвестным correlation_id: %s", message.correlation_id)
+            return
+        if not future.done():
+            future.set_result(json.loads(message.body.decode()))
+
+    async def _declare_queue(self, channel: AbstractChannel, queue_name: str, arguments: dict | None):
+        if queue_name not in self._declared_queues:
+            await channel.declare_queue(queue_name, durable=True, arguments=arguments)
+            self._declared_queues.add(queue_name)
+
+    async def call(self, queue_name: str, message: dict, timeout: float, queue_arguments: dict | None = None) -> dict:
+        """
+        Отправляет сообщение в указанную очередь и ожидает ответа не дольше timeout секунд.
+
+        Дедлайн передаётся потребителю дважды: как TTL сообщения (брокер выбросит
+        его из очереди) и как абсолютное время в заголовке x-deadline (потребитель
+        отбросит сообщение, если взял его уже после дедлайна).
+
+        Контекст трассировки передаётся в заголовке traceparent, время публикации -
+        в x-published-at (по нему потребитель считает время ожидания в очереди).
+
+        queue_arguments - аргументы объявления очереди; должны совпадать с теми,
+        с которыми её объявляет потребитель.
+        """
+        with span(f"rpc {queue_name}", queue=queue_name) as attrs:
+            return await self._call(queue_name, message, timeout, queue_arguments, attrs)
+
+    async def _call(self, queue_name: str, message: dict, timeout: float, queue_arguments: dict | None, attrs: dict) -> dict:
+        correlation_id = str(uuid.uuid4())
+        attrs["correlation_id"] = correlation_id
+        deadline = time.time() + timeout
+        future = asyncio.get_running_loop().create_future()
+        self._futures[correlation_id] = future
+
+        RPC_IN_FLIGHT.labels(queue=queue_name).inc()
+        try:
+            started = time.perf_counter()
+            async with self._channel_pool.acquire() as channel:
+                acquired = time.perf_counter()
+                RPC_CONNECT_SECONDS.labels(queue=queue_name).observe(acquired - started)
+                await self._declare_queue(channel, queue_name, queue_arguments)
+                await channel.default_exchange.publish(
+                    aio_pika.Message(
+                        body=json.dumps(message).encode(),
+                        correlation_id=correlation_id,
+                        reply_to=self._reply_queue.name,
+                        delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                        expiration=timeout,
+                        headers={
+                            "x-deadline": deadline,
+                            "x-published-at": time.time(),
+                            "traceparent": current_traceparent(),
+                        },
+                    ),
+                    routing_key=queue_name,
+                )
+            published = time.perf_counter()
+            RPC_PUBLISH_SECONDS.labels(queue=queue_name).observe(published - acquired)
+            logger.debug("Сообщение отправлено в очередь %s с Correlation ID: %s", queue_name, correlation_id)
+
+            response = await asyncio.wait_for(future, timeout=max(deadline - time.time(), 0))
+            RPC_REPLY_SECONDS.labels(queue=queue_name).observe(time.perf_counter() - published)
+            RPC_REPLIES.labels(queue=queue_name, status=response.get("status", "unknown")).inc()
+            attrs["status"] = response.get("status")
+            return response
+        except asyncio.TimeoutError:
+            RPC_REPLIES.labels(queue=queue_name, status="timeout").inc()
+            logger.warning("Истёк дедлайн ответа из очереди %s, Correlation ID: %s", queue_name, correlation_id)
+            raise RpcTimeoutError(queue_name)
+        except Exception:
+            RPC_REPLIES.labels(queue=queue_name, status="exception").inc()
+            raise
+        finally:
+            self._futures.pop(correlation_id, None)
+            RPC_IN_FLIGHT.labels(queue=queue_name).dec()
@@ -0,0 +1,35 @@
+import asyncio
+from typing import Awaitable, Callable
+
+from metrics import SINGLEFLIGHT_CALLS
+
+
+class SingleFlight:
+    """
+    Объединяет одновременные одинаковые запросы: пока вызов с ключом key
+    выполняется, остальные вызывающие ждут его результат, а не делают свой.
+
+    Вызов выполняется в отдельной задаче, поэтому отмена любого из ожидающих
+    (например, клиент закрыл соединение) не отменяет его для остальных.
+    """
+
+    def __init__(self):
+        self._calls: dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, label: str, fn: Callable[[], Awaitable[dict]]) -> dict:
+        task = self._calls.get(key)
+        if task is None:
+            SINGLEFLIGHT_CALLS.labels(queue=label, role="leader").inc()
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            SINGLEFLIGHT_CALLS.labels(queue=label, role="merged").inc()
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Помечаем исключение полученным, даже если все ожидающие уже ушли
+        if not task.cancelled():
+            task.exception()
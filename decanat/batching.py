@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+from metrics import BATCH_SIZE
+
+logger = logging.getLogger("exams-service")
+
+
+class MicroBatcher:
+    """
+    Собирает одиночные запросы в пакеты. Если ни один пакет не отправляется,
+    элемент уходит сразу, без ожидания; иначе элементы копятся, пока идёт отправка,
+    и пакет уходит, когда набралось max_size элементов, с первого элемента прошло
+    linger секунд или предыдущий пакет обработан.
+
+    flush получает список элементов и возвращает список результатов в том же
+    порядке; каждый вызвавший submit получает свой результат (исключение в списке
+    результатов достаётся только своему элементу). Если flush выбросил исключение,
+    оно достаётся всем элементам пакета. Элементы, которых уже не ждут (истёк
+    дедлайн сообщения и ожидание отменено), в пакет не попадают.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        flush: Callable[[list], Awaitable[list]],
+        max_size: int,
+        linger: float,
+    ):
+        self.name = name
+        self.flush = flush
+        self.max_size = max_size
+        self.linger = linger
+
+        self._items: list = []
+        self._futures: list[asyncio.Future] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        self._items.append(item)
+        self._futures.append(future)
+        if len(self._items) >= self.max_size or not self._tasks:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.linger, self._flush_now)
+        return await future
+
+    def _flush_now(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        items, futures = self._items, self._futures
+        self._items, self._futures = [], []
+        if items:
+            task = asyncio.create_task(self._run(items, futures))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, items: list, futures: list[asyncio.Future]):
+        try:
+            await self._send(items, futures)
+        finally:
+            # Накопленное во время отправки уходит сразу, не дожидаясь linger
+            if self._items:
+                self._flush_now()
+
+    async def _send(self, items: list, futures: list[asyncio.Future]):
+        waiting = [(item, future) for item, future in zip(items, futures) if not future.done()]
+        if not waiting:
+            return
+        items, futures = [item for item, _ in waiting], [future for _, future in waiting]
+        BATCH_SIZE.labels(name=self.name).observe(len(items))
+        try:
+            results = await self.flush(items)
+            if len(results) != len(items):
+                raise RuntimeError(f"{self.name}: получено {len(results)} результатов на {len(items)} элементов")
+        except Exception as e:
+            logger.warning("Ошибка отправки пакета %s из %s элементов: %r", self.name, len(items), e)
+            for future in futures:
+                # Ожидающий мог уже отказаться (истёк дедлайн сообщения)
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, result in zip(futures, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
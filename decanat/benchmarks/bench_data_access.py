@@ -0,0 +1,91 @@
+"""
+Сравнение задержек деканата в двух режимах доступа к данным:
+http - через backend-db, direct - запросами напрямую в PostgreSQL (db_access).
+
+Сообщения подаются прямо в process_message, брокер не участвует: его вклад
+одинаков в обоих режимах. Нужны запущенные backend-db и PostgreSQL,
+существующий пользователь (--email) и экзамен (--exam-id).
+
+    python benchmarks/bench_data_access.py --email student@example.com --exam-id 1
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db_access  # noqa: E402
+import main  # noqa: E402
+
+QUEUES = ["enrolments_exams_queue", "enroll_to_exam_queue"]
+errors = 0
+
+
+async def _capture_response(reply_to, response, correlation_id):
+    global errors
+    if response.get("status") != "success":
+        errors += 1
+
+
+def _percentile(values: list[float], p: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(len(values) * p))]
+
+
+async def run_queue(queue_name: str, direct: bool, args) -> list[float]:
+    main.DIRECT_DB_QUEUES = {queue_name} if direct else set()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+
+    async def one(i: int):
+        # Для записи на экзамен каждый запрос создаёт новую запись, а затем (вне замера) её удаляет
+        if queue_name == "enroll_to_exam_queue":
+            message = {"email": args.email, "exam_id": args.exam_id, "type": "exam", "date": "01-01-2030"}
+        else:
+            message = {"email": args.email}
+        async with semaphore:
+            start = time.perf_counter()
+            await main.process_message(queue_name, message, "bench", str(i))
+            latencies.append(time.perf_counter() - start)
+            if queue_name == "enroll_to_exam_queue":
+                await main.process_message("cancel_exam_queue", {"email": args.email, "exam_id": args.exam_id}, "bench", str(i))
+
+    # Запись одного email на один экзамен возможна только одна, поэтому запросы записи идут последовательно
+    concurrency = 1 if queue_name == "enroll_to_exam_queue" else args.concurrency
+    for start in range(0, args.requests, concurrency):
+        await asyncio.gather(*(one(i) for i in range(start, min(start + concurrency, args.requests))))
+    return latencies
+
+
+async def run(args):
+    global errors
+    main.send_response_to_queue = _capture_response
+    main.backend_client = main.create_backend_client()
+    db_access.init_engine(main.DATABASE_URL, main.DATABASE_POOL_SIZE, main.DATABASE_MAX_OVERFLOW)
+    try:
+        print(f"{'queue':<24} {'mode':<7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'mean ms':>8} {'errors':>7}")
+        for queue_name in QUEUES:
+            for direct in (False, True):
+                await run_queue(queue_name, direct, argparse.Namespace(**{**vars(args), "requests": args.warmup}))
+                errors = 0
+                latencies = await run_queue(queue_name, direct, args)
+                print(
+                    f"{queue_name:<24} {'direct' if direct else 'http':<7} "
+                    f"{_percentile(latencies, 0.5) * 1000:>8.2f} {_percentile(latencies, 0.95) * 1000:>8.2f} "
+                    f"{_percentile(latencies, 0.99) * 1000:>8.2f} {statistics.mean(latencies) * 1000:>8.2f} {errors:>7}"
+                )
+    finally:
+        await main.backend_client.aclose()
+        await db_access.dispose_engine()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--exam-id", type=int, required=True)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    asyncio.run(run(parser.parse_args()))
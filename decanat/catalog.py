@@ -0,0 +1,159 @@
+import asyncio
+import json
+import logging
+import uuid
+from typing import Awaitable, Callable
+
+import aio_pika
+from aio_pika.abc import AbstractIncomingMessage, AbstractRobustConnection
+
+from metrics import CATALOG_RELOADS, CATALOG_VERSION
+
+logger = logging.getLogger("exams-service")
+
+CATALOG_EVENTS_EXCHANGE = "catalog_events"
+
+
+class CatalogReplica:
+    """
+    Копия каталогов (экзамены, пересдачи) в памяти деканата.
+
+    Заполняется снимком backend-db ({"version", "items"}) и поддерживается
+    событиями из fanout-обмена catalog_events, у каждого из которых есть номер
+    версии. Событие со следующей версией применяется, уже учтённое - пропускается,
+    а пропуск версии (потерянное событие) ведёт к полной перезагрузке. Пока
+    каталог не загружен, is_loaded возвращает False и чтения идут в backend-db.
+    """
+
+    def __init__(
+        self,
+        entities: list[str],
+        fetch_snapshot: Callable[[str], Awaitable[dict]],
+        reload_interval: float,
+    ):
+        self.entities = entities
+        self.fetch_snapshot = fetch_snapshot
+        self.reload_interval = reload_interval
+
+        self._versions: dict[str, int | None] = {entity: None for entity in entities}
+        self._items: dict[str, list[dict]] = {entity: [] for entity in entities}
+        # События, пришедшие во время загрузки снимка: применяются поверх него
+        self._pending: dict[str, list[dict]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def is_loaded(self, entity: str) -> bool:
+        return self._versions.get(entity) is not None
+
+    def items(self, entity: str) -> list[dict]:
+        return self._items[entity]
+
+    async def start(self, connection: AbstractRobustConnection):
+        """
+        Подписывается на события и загружает каталоги. Подписка оформляется до загрузки,
+        чтобы не потерять изменения, сделанные между снимком и подпиской.
+        """
+        channel = await connection.channel()
+        exchange = await channel.declare_exchange(CATALOG_EVENTS_EXCHANGE, aio_pika.ExchangeType.FANOUT, durable=True)
+        queue = await channel.declare_queue(f"decanat.catalog_events.{uuid.uuid4().hex}", exclusive=True, auto_delete=True)
+        await queue.bind(exchange)
+        await queue.consume(self._on_message)
+        # События, пришедшие пока соединение было разорвано, потеряны
+        connection.reconnect_callbacks.add(lambda *args: self._reload_all("reconnect"))
+
+        await asyncio.gather(*(self.reload(entity, "startup") for entity in self.entities))
+        self._spawn(self._reload_periodically())
+
+    async def reload(self, entity: str, reason: str):
+        """
+        Загружает снимок каталога entity. При ошибке каталог остаётся незагруженным.
+        """
+        if entity in self._pending:
+            return
+        self._pending[entity] = []
+        await self._load(entity, reason)
+
+    def _schedule_reload(self, entity: str, reason: str):
+        # Буфер событий заводится сразу, а не при старте задачи, чтобы события,
+        # пришедшие до её запуска, не потерялись
+        if entity in self._pending:
+            return
+        self._pending[entity] = []
+        self._spawn(self._load(entity, reason))
+
+    async def _load(self, entity: str, reason: str):
+        CATALOG_RELOADS.labels(entity=entity, reason=reason).inc()
+        try:
+            snapshot = await self.fetch_snapshot(entity)
+            self._items[entity] = list(snapshot["items"])
+            self._set_version(entity, int(snapshot["version"]))
+            logger.info("Каталог %s загружен (%s): версия %s, записей %s",
+                        entity, reason, snapshot["version"], len(snapshot["items"]))
+        except Exception as e:
+            self._set_version(entity, None)
+            logger.error("Не удалось загрузить каталог %s (%s): %s", entity, reason, e)
+        finally:
+            pending = self._pending.pop(entity)
+        for event in sorted(pending, key=lambda event: event.get("version") or 0):
+            self._apply(event)
+
+    async def _on_message(self, message: AbstractIncomingMessage):
+        async with message.process():
+            try:
+                self._apply(json.loads(message.body))
+            except Exception as e:
+                logger.error("Ошибка обработки события каталога: %s", e, exc_info=True)
+
+    def _apply(self, event: dict):
+        entity = event.get("entity")
+        if entity not in self._versions:
+            return
+        if entity in self._pending:
+            self._pending[entity].append(event)
+            return
+
+        current = self._versions[entity]
+        if current is None:
+            # Каталог не загружен: перезагрузка (периодическая) подтянет изменения
+            return
+        version = event.get("version")
+        if version is not None and version <= current:
+            return
+        if version != current + 1 or not self._apply_change(entity, event.get("action"), event.get("data") or {}):
+            logger.warning("Каталог %s: версия %s, пришло событие версии %s, перезагружаем", entity, current, version)
+            self._set_version(entity, None)
+            self._schedule_reload(entity, "gap")
+            return
+        self._set_version(entity, version)
+
+    def _apply_change(self, entity: str, action: str, data: dict) -> bool:
+        items = self._items[entity]
+        if action == "created":
+            items.append(data)
+        elif action == "updated":
+            self._items[entity] = [data if item.get("id") == data.get("id") else item for item in items]
+        elif action == "deleted":
+            self._items[entity] = [item for item in items if item.get("id") != data.get("id")]
+        elif action == "imported":
+            items.extend(data.get("items") or [])
+        else:
+            return False
+        return True
+
+    def _set_version(self, entity: str, version: int | None):
+        self._versions[entity] = version
+        CATALOG_VERSION.labels(entity=entity).set(-1 if version is None else version)
+
+    def _reload_all(self, reason: str):
+        for entity in self.entities:
+            self._schedule_reload(entity, reason)
+
+    async def _reload_periodically(self):
+        # Страховка от потерянных событий, после которых новых изменений не было
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            self._reload_all("periodic")
+
+    def _spawn(self, coroutine):
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -0,0 +1,281 @@
+import logging
+from datetime import date, datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, MetaData, String, Table, delete, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from pagination import InvalidCursor, InvalidLimit, decode_cursor, encode_cursor, page_params
+
+logger = logging.getLogger("exams-service")
+
+# Таблицы backend-db (back-db/models.py), описанные в объёме, нужном деканату.
+# Схемой по-прежнему владеет backend-db: изменения вносятся через его миграции.
+metadata = MetaData()
+
+exams = Table(
+    "exams", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("date", DateTime, nullable=False),
+    Column("capacity", Integer, nullable=True),
+    Column("enrolled_count", Integer, nullable=False),
+)
+
+retakes = Table(
+    "retakes", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("date", DateTime, nullable=False),
+    Column("capacity", Integer, nullable=True),
+    Column("enrolled_count", Integer, nullable=False),
+)
+
+enrolments_exams = Table(
+    "enrolments_exams", metadata,
+    Column("email", String, ForeignKey("users.email"), primary_key=True),
+    Column("date", DateTime, nullable=False),
+    Column("exam_id", Integer, ForeignKey("exams.id"), primary_key=True),
+    Column("type", String, nullable=False),
+)
+
+enrolments_retake = Table(
+    "enrolments_retake", metadata,
+    Column("email", String, ForeignKey("users.email"), primary_key=True),
+    Column("date", DateTime, nullable=False),
+    Column("retake_id", Integer, ForeignKey("retakes.id"), primary_key=True),
+    Column("type", String, nullable=False),
+)
+
+engine: AsyncEngine | None = None
+
+
+def init_engine(database_url: str, pool_size: int, max_overflow: int):
+    global engine
+    engine = create_async_engine(database_url, pool_size=pool_size, max_overflow=max_overflow)
+
+
+async def dispose_engine():
+    if engine is not None:
+        await engine.dispose()
+
+
+def _format_date(value):
+    if isinstance(value, (datetime, date)):
+        return value.strftime("%Y-%m-%d")
+    return value
+
+
+def _parse_date(value: str) -> datetime:
+    return datetime.strptime(value, "%d-%m-%Y")
+
+
+async def _fetch_page(query, key_columns: list, limit: int | None, after: str | None) -> tuple[list, str | None]:
+    """
+    Страница по ключу key_columns, как GET-списки backend-db (limit=None - все записи).
+    """
+    if after is not None:
+        values = decode_cursor(after, [column.type.python_type for column in key_columns])
+        if len(key_columns) == 1:
+            query = query.where(key_columns[0] > values[0])
+        else:
+            query = query.where(tuple_(*key_columns) > tuple_(*values))
+    query = query.order_by(*key_columns)
+    if limit is not None:
+        query = query.limit(limit + 1)
+    async with engine.connect() as conn:
+        rows = (await conn.execute(query)).mappings().all()
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor([rows[-1][column.name] for column in key_columns])
+
+
+async def _list_catalog(table: Table, limit: int | None, after: str | None) -> tuple[list[dict], str | None]:
+    rows, next_cursor = await _fetch_page(select(table), [table.c.id], limit, after)
+    return [
+        {
+            "id": row["id"],
+            "name": row["name"],
+            "date": _format_date(row["date"]),
+            "capacity": row["capacity"],
+        }
+        for row in rows
+    ], next_cursor
+
+
+async def _list_enrolments(
+    table: Table, catalog: Table, key: str, name_key: str, email: str, limit: int | None, after: str | None
+) -> tuple[list[dict], str | None]:
+    query = (
+        select(table, catalog.c.name.label(name_key))
+        .join(catalog, table.c[key] == catalog.c.id)
+        .where(table.c.email == email)
+    )
+    rows, next_cursor = await _fetch_page(query, [table.c.email, table.c[key]], limit, after)
+    return [
+        {
+            "email": row["email"],
+            key: row[key],
+            "type": row["type"],
+            "date": _format_date(row["date"]),
+            name_key: row[name_key],
+        }
+        for row in rows
+    ], next_cursor
+
+
+async def _change_seats(conn, catalog: Table, item_id: int, seats: int) -> bool:
+    """
+    Занимает (seats > 0) или освобождает места условным UPDATE, как _take_seats в
+    back-db/crud.py: мест не занимается больше capacity. False - мест не хватает.
+    """
+    query = update(catalog).where(catalog.c.id == item_id)
+    if seats > 0:
+        query = query.where(or_(catalog.c.capacity.is_(None), catalog.c.enrolled_count + seats <= catalog.c.capacity))
+    result = await conn.execute(
+        query.values(enrolled_count=catalog.c.enrolled_count + seats).returning(catalog.c.id)
+    )
+    return result.first() is not None
+
+
+def _reference_error(error: IntegrityError, not_found: str) -> str | None:
+    """
+    Текст ошибки для нарушения внешнего ключа (sqlstate 23503), как у backend-db:
+    столбец виден по имени ограничения <таблица>_<столбец>_fkey. None - другое нарушение.
+    """
+    message = str(error.orig)
+    if getattr(error.orig, "sqlstate", None) != "23503" and "foreign key" not in message.lower():
+        return None
+    return "Пользователь не найден" if "_email_fkey" in message else not_found
+
+
+async def _enroll(
+    table: Table, catalog: Table, key: str, message: dict, not_found: str, exists: str, no_seats: str
+) -> str | None:
+    """
+    Создаёт запись и занимает место так же, как backend-db (_insert_enrolment):
+    INSERT ... ON CONFLICT DO NOTHING RETURNING без предварительных проверок, затем
+    условный UPDATE места. Возвращает текст ошибки (как detail у backend-db) или None при успехе.
+    """
+    try:
+        email, item_id, kind = message["email"], _parse_id(message[key]), message["type"]
+        enrolment_date = _parse_date(message["date"])
+    except (KeyError, TypeError, ValueError):
+        return "Некорректные данные записи"
+    if item_id is None or not isinstance(email, str) or not isinstance(kind, str):
+        return "Некорректные данные записи"
+
+    statement = (
+        pg_insert(table)
+        .values(email=email, date=enrolment_date, type=kind, **{key: item_id})
+        .on_conflict_do_nothing(index_elements=[table.c.email, table.c[key]])
+        .returning(table.c.email)
+    )
+    async with engine.connect() as conn:
+        async with conn.begin() as transaction:
+            try:
+                inserted = (await conn.execute(statement)).first()
+            except IntegrityError as e:
+                await transaction.rollback()
+                error = _reference_error(e, not_found)
+                if error is None:
+                    raise
+                return error
+            if inserted is None:
+                await transaction.rollback()
+                return exists
+            if not await _change_seats(conn, catalog, item_id, 1):
+                await transaction.rollback()
+                return no_seats
+    return None
+
+
+def _parse_id(value) -> int | None:
+    """
+    Идентификатор экзамена или пересдачи из сообщения (число или строка с числом); None - некорректный.
+    """
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+async def _cancel(table: Table, catalog: Table, key: str, email: str, item_id: int) -> bool:
+    async with engine.begin() as conn:
+        result = await conn.execute(
+            delete(table).where(table.c.email == email, table.c[key] == item_id)
+        )
+        if result.rowcount > 0:
+            await _change_seats(conn, catalog, item_id, -1)
+    return result.rowcount > 0
+
+
+async def process_direct(queue_name: str, message: dict) -> dict:
+    """
+    Обрабатывает сообщение очереди запросами напрямую в PostgreSQL, минуя HTTP-запрос
+    к backend-db. Ответы совпадают по формату с ответами в режиме через backend-db.
+    """
+    try:
+        limit, after = page_params(message)
+        if queue_name == "exams_queue":
+            items, next_cursor = await _list_catalog(exams, limit, after)
+            return {"status": "success", "exams": items, "next_cursor": next_cursor}
+        if queue_name == "retakes_queue":
+            items, next_cursor = await _list_catalog(retakes, limit, after)
+            return {"status": "success", "retakes": items, "next_cursor": next_cursor}
+
+        if queue_name == "enrolments_exams_queue":
+            email = message.get("email")
+            if not email or not isinstance(email, str):
+                return {"status": "failed", "message": "Отсутствует email"}
+            items, next_cursor = await _list_enrolments(enrolments_exams, exams, "exam_id", "exam_name", email, limit, after)
+            return {"status": "success", "enrolments-exams": items, "next_cursor": next_cursor}
+        if queue_name == "enrolments_retake_queue":
+            email = message.get("email")
+            if not email or not isinstance(email, str):
+                return {"status": "failed", "message": "Отсутствует email"}
+            items, next_cursor = await _list_enrolments(enrolments_retake, retakes, "retake_id", "retake_name", email, limit, after)
+            return {"status": "success", "enrolments-retake": items, "next_cursor": next_cursor}
+    except InvalidCursor:
+        return {"status": "failed", "message": "Некорректный курсор"}
+    except InvalidLimit:
+        return {"status": "failed", "message": "Некорректный limit"}
+
+    if queue_name == "enroll_to_exam_queue":
+        error = await _enroll(enrolments_exams, exams, "exam_id", message,
+                              "Экзамен не найден", "Запись на этот экзамен уже существует",
+                              "Нет свободных мест на экзамене")
+        return {"status": "success"} if error is None else {"status": "failed", "enrolments-exams": error}
+    if queue_name == "enroll_to_retake_queue":
+        error = await _enroll(enrolments_retake, retakes, "retake_id", message,
+                              "Пересдача не найдена", "Запись на эту пересдачу уже существует",
+                              "Нет свободных мест на пересдаче")
+        return {"status": "success"} if error is None else {"status": "failed", "enrolments-retake": error}
+
+    if queue_name == "cancel_exam_queue":
+        email, exam_id = message.get("email"), message.get("exam_id")
+        if not email or not exam_id:
+            return {"status": "failed", "message": "Отсутствуют необходимые данные (email или exam_id)"}
+        exam_id = _parse_id(exam_id)
+        if exam_id is None or not isinstance(email, str):
+            return {"status": "failed", "enrolments-exams": "Некорректные данные записи"}
+        if await _cancel(enrolments_exams, exams, "exam_id", email, exam_id):
+            return {"status": "success"}
+        return {"status": "failed", "enrolments-exams": "Запись на экзамен не найдена"}
+    if queue_name == "cancel_retake_queue":
+        email, retake_id = message.get("email"), message.get("retake_id")
+        if not email or not retake_id:
+            return {"status": "failed", "message": "Отсутствуют необходимые данные (email или retake_id)"}
+        retake_id = _parse_id(retake_id)
+        if retake_id is None or not isinstance(email, str):
+            return {"status": "failed", "enrolments-retake": "Некорректные данные записи"}
+        if await _cancel(enrolments_retake, retakes, "retake_id", email, retake_id):
+            return {"status": "success"}
+        return {"status": "failed", "enrolments-retake": "Запись на пересдачу не найдена"}
+
+    logger.error("Неизвестная очередь: %s", queue_name)
+    return {"status": "error", "message": "Неизвестная очередь"}
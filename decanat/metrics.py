@@ -0,0 +1,48 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+CONSUMER_IN_FLIGHT = Gauge(
+    "decanat_consumer_in_flight",
+    "Сообщения, обрабатываемые в данный момент",
+    ["queue"],
+)
+CONSUMER_MESSAGE_SECONDS = Histogram(
+    "decanat_consumer_message_seconds",
+    "Время обработки сообщения (от получения до ack)",
+    ["queue"],
+)
+MESSAGE_RETRIES = Counter(
+    "decanat_message_retries_total",
+    "Сообщения, отложенные для повторной обработки после временной ошибки",
+    ["queue"],
+)
+DEAD_LETTERED = Counter(
+    "decanat_dead_lettered_total",
+    "Сообщения, перемещённые в очередь недоставленных (reason: max_attempts, error)",
+    ["queue", "reason"],
+)
+CIRCUIT_BREAKER_STATE = Gauge(
+    "decanat_circuit_breaker_state",
+    "Состояние автомата (0 - замкнут, 1 - пробные запросы, 2 - разомкнут)",
+    ["name"],
+)
+CIRCUIT_BREAKER_REJECTED = Counter(
+    "decanat_circuit_breaker_rejected_total",
+    "Вызовы, отклонённые автоматом без обращения к сервису",
+    ["name"],
+)
+CATALOG_RELOADS = Counter(
+    "decanat_catalog_reloads_total",
+    "Полные загрузки каталога (reason: startup, reconnect, gap, periodic)",
+    ["entity", "reason"],
+)
+CATALOG_VERSION = Gauge(
+    "decanat_catalog_version",
+    "Версия каталога в памяти деканата (-1 - не загружен)",
+    ["entity"],
+)
+BATCH_SIZE = Histogram(
+    "decanat_batch_size",
+    "Число элементов в пакетах, отправленных в backend-db",
+    ["name"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200),
+)
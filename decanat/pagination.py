@@ -0,0 +1,115 @@
+import base64
+import json
+import os
+
+import httpx
+
+# Списки backend-db отдаются страницами (limit, after, курсор следующей страницы
+# в заголовке X-Next-Cursor). Сообщение с полем limit получает одну страницу и
+# next_cursor в ответе, без limit - весь список (после курсора after, если он задан),
+# собранный по страницам LIST_PAGE_SIZE.
+LIST_PAGE_SIZE = int(os.getenv("LIST_PAGE_SIZE", 100))
+LIST_PAGE_MAX_LIMIT = int(os.getenv("LIST_PAGE_MAX_LIMIT", 1000))
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    """
+    Курсор не разбирается или не подходит к списку.
+    """
+
+
+class InvalidLimit(ValueError):
+    """
+    limit в сообщении не целое число.
+    """
+
+
+def encode_cursor(values: list) -> str:
+    """
+    Тот же формат, что у backend-db (back-db/pagination.py): курсоры взаимозаменяемы.
+    """
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: list[type]) -> list:
+    """
+    Значения ключа из курсора; каждое должно иметь тип соответствующего поля ключа (types).
+    """
+    if not isinstance(cursor, str):
+        raise InvalidCursor(cursor)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise InvalidCursor(cursor)
+    if (
+        not isinstance(values, list)
+        or len(values) != len(types)
+        or any(type(value) is not expected for value, expected in zip(values, types))
+    ):
+        raise InvalidCursor(cursor)
+    return values
+
+
+def page_params(message: dict) -> tuple[int | None, str | None]:
+    """
+    (limit, after) из сообщения; limit ограничивается LIST_PAGE_MAX_LIMIT.
+    Некорректные значения - InvalidLimit и InvalidCursor.
+    """
+    limit = message.get("limit")
+    if limit is not None:
+        try:
+            limit = max(1, min(int(limit), LIST_PAGE_MAX_LIMIT))
+        except (TypeError, ValueError):
+            raise InvalidLimit(limit)
+    after = message.get("after")
+    if after is not None and not isinstance(after, str):
+        raise InvalidCursor(after)
+    return limit, after
+
+
+def paginate_items(
+    items: list[dict], keys: dict[str, type], limit: int | None, after: str | None
+) -> tuple[list[dict], str | None]:
+    """
+    Страница списка в памяти (каталоги деканата) с той же семантикой, что у backend-db.
+    keys - поля ключа и их типы.
+    """
+    items = sorted(items, key=lambda item: [item[key] for key in keys])
+    if after is not None:
+        position = decode_cursor(after, list(keys.values()))
+        items = [item for item in items if [item[key] for key in keys] > position]
+    if limit is None or len(items) <= limit:
+        return items, None
+    page = items[:limit]
+    return page, encode_cursor([page[-1][key] for key in keys])
+
+
+async def get_list(
+    client: httpx.AsyncClient,
+    path: str,
+    params: dict,
+    limit: int | None,
+    after: str | None,
+) -> tuple[httpx.Response, list | None, str | None]:
+    """
+    Запрашивает список у backend-db. Возвращает (последний ответ, записи, курсор
+    следующей страницы). Записи - None, если ответ не 200.
+    """
+    if limit is not None:
+        response = await client.get(path, params={**params, "limit": limit, **({"after": after} if after else {})})
+        if response.status_code != 200:
+            return response, None, None
+        return response, response.json(), response.headers.get(NEXT_CURSOR_HEADER)
+
+    # Без limit собирается весь остаток списка после курсора after
+    items = []
+    cursor = after
+    while True:
+        response = await client.get(path, params={**params, "limit": LIST_PAGE_SIZE, **({"after": cursor} if cursor else {})})
+        if response.status_code != 200:
+            return response, None, None
+        items.extend(response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return response, items, None
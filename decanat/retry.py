@@ -0,0 +1,130 @@
+import logging
+import os
+import random
+import time
+
+import aio_pika
+import httpx
+from sqlalchemy import exc as sa_exc
+
+from metrics import DEAD_LETTERED, MESSAGE_RETRIES
+
+logger = logging.getLogger("exams-service")
+
+# Всего попыток обработки сообщения (первая + повторные)
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", 5))
+# Задержка перед повтором n: RETRY_BASE_DELAY * 2^(n-1), не больше RETRY_MAX_DELAY, ± RETRY_JITTER
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", 0.5))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", 30))
+RETRY_JITTER = float(os.getenv("RETRY_JITTER", 0.2))
+
+RETRY_PREFIX = "decanat.retry."
+DEAD_LETTER_QUEUE = "decanat.dead_letter"
+
+
+class BackendUnavailable(Exception):
+    """
+    backend-db ответил 5xx: ошибка на его стороне, запрос можно повторить.
+    """
+
+
+# Ошибки, после которых сообщение откладывается и обрабатывается повторно
+TRANSIENT_ERRORS = (
+    httpx.TransportError,
+    BackendUnavailable,
+    sa_exc.OperationalError,
+    sa_exc.InterfaceError,
+    sa_exc.TimeoutError,
+    ConnectionError,
+)
+
+
+async def raise_for_backend_unavailable(response: httpx.Response):
+    """
+    Хук ответа httpx: 5xx от backend-db превращается в BackendUnavailable.
+    """
+    if response.status_code >= 500:
+        raise BackendUnavailable(f"{response.request.method} {response.request.url.path}: {response.status_code}")
+
+
+def retry_delay(attempt: int) -> float:
+    """
+    Задержка перед повтором номер attempt (с 1) с экспоненциальным ростом и случайным разбросом.
+    """
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1))
+    return delay * random.uniform(1 - RETRY_JITTER, 1 + RETRY_JITTER)
+
+
+async def declare_retry_topology(channel: aio_pika.abc.AbstractChannel):
+    """
+    Объявляет очереди отложенных повторов (по одной на номер повтора) и очередь недоставленных.
+
+    Сообщение публикуется в fanout-обмен decanat.retry.<n> с ключом исходной очереди
+    и лежит в очереди decanat.retry.<n>, пока не истечёт его expiration. Затем брокер
+    переправляет его через обмен по умолчанию обратно в исходную очередь: ключ
+    маршрутизации при этом сохраняется. У каждого номера повтора своя очередь, поэтому
+    сообщения с короткой задержкой не ждут за сообщениями с длинной.
+    """
+    for attempt in range(1, RETRY_MAX_ATTEMPTS):
+        exchange = await channel.declare_exchange(f"{RETRY_PREFIX}{attempt}", aio_pika.ExchangeType.FANOUT, durable=True)
+        queue = await channel.declare_queue(
+            f"{RETRY_PREFIX}{attempt}",
+            durable=True,
+            arguments={"x-dead-letter-exchange": ""},
+        )
+        await queue.bind(exchange)
+    await channel.declare_queue(DEAD_LETTER_QUEUE, durable=True)
+
+
+def _copy(message: aio_pika.abc.AbstractIncomingMessage, headers: dict, expiration: float | None = None) -> aio_pika.Message:
+    return aio_pika.Message(
+        body=message.body,
+        headers={**(message.headers or {}), **headers},
+        correlation_id=message.correlation_id,
+        reply_to=message.reply_to,
+        delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+        expiration=expiration,
+    )
+
+
+async def schedule_retry(
+    channel: aio_pika.abc.AbstractChannel,
+    queue_name: str,
+    message: aio_pika.abc.AbstractIncomingMessage,
+    attempt: int,
+    delay: float,
+):
+    """
+    Откладывает сообщение на delay секунд, после чего оно вернётся в queue_name с x-attempts = attempt.
+    """
+    exchange = await channel.get_exchange(f"{RETRY_PREFIX}{attempt}", ensure=False)
+    await exchange.publish(_copy(message, {"x-attempts": attempt}, expiration=delay), routing_key=queue_name)
+    MESSAGE_RETRIES.labels(queue=queue_name).inc()
+    logger.warning("Сообщение из %s отложено на %.2f с (попытка %s из %s, correlation_id: %s)",
+                   queue_name, delay, attempt + 1, RETRY_MAX_ATTEMPTS, message.correlation_id)
+
+
+async def dead_letter(
+    channel: aio_pika.abc.AbstractChannel,
+    queue_name: str,
+    message: aio_pika.abc.AbstractIncomingMessage,
+    attempts: int,
+    reason: str,
+    error: Exception,
+):
+    """
+    Перекладывает сообщение в очередь недоставленных (decanat.dead_letter) для разбора и повтора через dlq.py.
+    """
+    await channel.default_exchange.publish(
+        _copy(message, {
+            "x-original-queue": queue_name,
+            "x-attempts": attempts,
+            "x-reason": reason,
+            "x-error": repr(error)[:1000],
+            "x-dead-lettered-at": time.time(),
+        }),
+        routing_key=DEAD_LETTER_QUEUE,
+    )
+    DEAD_LETTERED.labels(queue=queue_name, reason=reason).inc()
+    logger.error("Сообщение из %s перемещено в %s (%s, попыток: %s, correlation_id: %s): %r",
+                 queue_name, DEAD_LETTER_QUEUE, reason, attempts, message.correlation_id, error)
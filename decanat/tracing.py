@@ -0,0 +1,131 @@
+import contextvars
+import json
+import logging
+import os
+import secrets
+import sys
+import time
+from contextlib import contextmanager
+
+SERVICE_NAME = "exams-service"
+
+# none - не выгружать спаны, stdout - в стандартный вывод, иначе - путь к файлу (JSON Lines)
+TRACE_EXPORT = os.getenv("TRACE_EXPORT", "none")
+
+# (trace_id, span_id) текущего спана
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+exporter = logging.getLogger("traces")
+exporter.propagate = False
+exporter.setLevel(logging.INFO)
+if TRACE_EXPORT == "stdout":
+    exporter.addHandler(logging.StreamHandler(sys.stdout))
+elif TRACE_EXPORT != "none":
+    exporter.addHandler(logging.FileHandler(TRACE_EXPORT))
+else:
+    exporter.disabled = True
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str] | None:
+    """
+    Разбирает заголовок W3C traceparent ("00-<trace_id>-<span_id>-<flags>").
+    """
+    if not value:
+        return None
+    parts = value.split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2]
+
+
+def format_traceparent(trace_id: str, span_id: str) -> str:
+    return f"00-{trace_id}-{span_id}-01"
+
+
+def current_traceparent() -> str | None:
+    """
+    traceparent текущего спана для передачи в заголовках AMQP и HTTP.
+    """
+    current = _current_span.get()
+    if current is None:
+        return None
+    return format_traceparent(*current)
+
+
+def export_span(trace_id: str, span_id: str, parent_id: str | None, name: str, start: float, end: float, attrs: dict):
+    if exporter.disabled:
+        return
+    exporter.info(json.dumps({
+        "service": SERVICE_NAME,
+        "trace_id": trace_id,
+        "span_id": span_id,
+        "parent_id": parent_id,
+        "name": name,
+        "start": start,
+        "duration_ms": round((end - start) * 1000, 3),
+        "attrs": attrs,
+    }, default=str))
+
+
+@contextmanager
+def span(name: str, traceparent: str | None = None, **attrs):
+    """
+    Спан вокруг блока кода. Родитель берётся из traceparent (если передан),
+    иначе из текущего спана; если нет ни того, ни другого, начинается новая трасса.
+    Атрибуты можно дополнять через возвращаемый словарь.
+    """
+    parent = parse_traceparent(traceparent) or _current_span.get()
+    if parent is None:
+        trace_id, parent_id = secrets.token_hex(16), None
+    else:
+        trace_id, parent_id = parent
+    span_id = secrets.token_hex(8)
+
+    token = _current_span.set((trace_id, span_id))
+    start = time.time()
+    try:
+        yield attrs
+    except BaseException as e:
+        attrs["error"] = repr(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        export_span(trace_id, span_id, parent_id, name, start, time.time(), attrs)
+
+
+def record_span(name: str, start: float, end: float, traceparent: str | None = None, **attrs):
+    """
+    Записывает уже прошедший интервал (например, ожидание сообщения в очереди)
+    как дочерний спан traceparent или текущего спана.
+    """
+    parent = parse_traceparent(traceparent) or _current_span.get()
+    if parent is None:
+        return
+    export_span(parent[0], secrets.token_hex(8), parent[1], name, start, end, attrs)
+
+
+async def _on_request(request):
+    current = _current_span.get()
+    if current is None:
+        return
+    trace_id, parent_id = current
+    span_id = secrets.token_hex(8)
+    request.headers["traceparent"] = format_traceparent(trace_id, span_id)
+    request.extensions["trace"] = (trace_id, span_id, parent_id, time.time())
+
+
+async def _on_response(response):
+    trace = response.request.extensions.get("trace")
+    if trace is None:
+        return
+    trace_id, span_id, parent_id, start = trace
+    export_span(
+        trace_id, span_id, parent_id,
+        f"{response.request.method} {response.request.url.path}",
+        start, time.time(),
+        {"status": response.status_code},
+    )
+
+
+# Хуки httpx: передают traceparent в backend-db и записывают спан HTTP-вызова
+HTTPX_EVENT_HOOKS = {"request": [_on_request], "response": [_on_response]}
@@ -3,7 +3,7 @@ import ExamCard from "../ExamCard/ExamCard";
 import "./account.css";
 import "../../style/gridLayout.css";
 import { AuthContext } from "../../Context/AuthContext";
-import { fetchEnrolledExams, fetchEnrolledRetakes, cancelExam, cancelRetake } from "../../api/api";
+import { fetchDashboard, cancelExam, cancelRetake } from "../../api/api";
 
 const Account = () => {
     const [enrolledExams, setEnrolledExams] = useState([]);
@@ -13,28 +13,27 @@ const Account = () => {
     const [errorRetakes, setErrorRetakes] = useState("");
     const { isAuthenticated, userName, userEmail } = useContext(AuthContext);
 
-    const fetchEnrolledExamsData = useCallback(async () => {
+    // Записи на экзамены и пересдачи приходят одним запросом /dashboard;
+    // если одна из частей не загрузилась, другая всё равно показывается
+    const fetchDashboardData = useCallback(async () => {
         setLoading(true);
         setErrorExams("");
-
-        try {
-            const exams = await fetchEnrolledExams(userEmail);
-            setEnrolledExams(exams);
-        } catch (error) {
-            setErrorExams("Не удалось загрузить записи на экзамены. Попробуйте снова.");
-        } finally {
-            setLoading(false);
-        }
-    }, [userEmail]);
-
-    const fetchEnrolledRetakesData = useCallback(async () => {
-        setLoading(true);
         setErrorRetakes("");
 
         try {
-            const retakes = await fetchEnrolledRetakes(userEmail);
-            setEnrolledRetakes(retakes);
+            const dashboard = await fetchDashboard(userEmail);
+            if (dashboard["enrolments-exams"]) {
+                setEnrolledExams(dashboard["enrolments-exams"]);
+            } else {
+                setErrorExams("Не удалось загрузить записи на экзамены. Попробуйте снова.");
+            }
+            if (dashboard["enrolments-retake"]) {
+                setEnrolledRetakes(dashboard["enrolments-retake"]);
+            } else {
+                setErrorRetakes("Не удалось загрузить записи на пересдачи. Попробуйте снова.");
+            }
         } catch (error) {
+            setErrorExams("Не удалось загрузить записи на экзамены. Попробуйте снова.");
             setErrorRetakes("Не удалось загрузить записи на пересдачи. Попробуйте снова.");
         } finally {
             setLoading(false);
@@ -43,10 +42,9 @@ const Account = () => {
 
     useEffect(() => {
         if (isAuthenticated) {
-            fetchEnrolledExamsData();
-            fetchEnrolledRetakesData();
+            fetchDashboardData();
         }
-    }, [isAuthenticated, fetchEnrolledExamsData, fetchEnrolledRetakesData]);
+    }, [isAuthenticated, fetchDashboardData]);
 
     const handleCancelExam = async (examId) => {
         try {
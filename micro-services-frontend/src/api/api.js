@@ -144,3 +144,16 @@ export const fetchEnrolledRetakes = async (email) => {
     );
   }
 };
+
+export const fetchDashboard = async (email) => {
+  try {
+    const response = await axios.get(
+      `${BASE_URL}/dashboard?email=${encodeURIComponent(email)}`
+    );
+    return response.data;
+  } catch (error) {
+    throw new Error(
+      "Не удалось загрузить данные главной страницы. Попробуйте снова."
+    );
+  }
+};